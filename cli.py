@@ -0,0 +1,147 @@
+# cold start is measured from the first line of entry point
+import time
+START_TIME = time.perf_counter()
+
+# to run scrapper from command line with settings
+import argparse
+# logs instead of prints
+import logging
+# settings from environment variables
+import os
+# types of settings from annotations
+import typing
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# settings, overridden by environment variables and arguments. It doesn't import selenium
+import constants
+# logging customization
+from my_logging import get_logger
+
+# prefix of environment variables with settings, e.g. TRIPADVISER_MAX_RESTAURANTS_COUNT=100
+ENV_PREFIX = 'TRIPADVISER_'
+# settings which are recomputed in apply_settings() -> settings to set instead
+DERIVED_SETTINGS = {
+    'FILEPATH': 'OUTPUT_FILEPATH and OUTPUT_EXTENSION (or --output)',
+    'FIELDS': 'FIELD_PROFILE (or --fields)',
+}
+
+
+def parse_value(name: str, value: str):
+    """ Convert str value of setting to type annotated in constants.py, or to type of default value
+    if setting is not annotated
+    """
+
+    annotation = constants.__annotations__.get(name, type(getattr(constants, name)))
+    # e.g. tuple[str, ...] -> tuple
+    annotation = typing.get_origin(annotation) or annotation
+    if annotation is bool:
+        if value.lower() in ('1', 'true', 'yes', 'y'):
+            return True
+        if value.lower() in ('0', 'false', 'no', 'n'):
+            return False
+        raise SystemExit(f'{name}={value!r}. Expected boolean value')
+    if annotation is tuple:
+        return tuple(item.strip() for item in value.split(',') if item.strip())
+    if annotation in (int, float, Path):
+        try:
+            return annotation(value)
+        except ValueError:
+            raise SystemExit(f'{name}={value!r}. Expected {annotation.__name__} value')
+    return value
+
+
+def get_settings(args: argparse.Namespace) -> dict:
+    """ Settings which override constants.py. Arguments override environment variables """
+
+    settings = {}
+    for key, value in os.environ.items():
+        if key.startswith(ENV_PREFIX):
+            settings[key.removeprefix(ENV_PREFIX)] = value
+
+    for item in args.set or []:
+        name, _, value = item.partition('=')
+        settings[name] = value
+
+    # named arguments
+    named = {
+        'URL': args.url,
+        'MAX_RESTAURANTS_COUNT': args.max_restaurants,
+        'MAX_REVIEWS_PER_RESTAURANT': args.max_reviews,
+        'FIELD_PROFILE': args.fields,
+        'TABS_PER_BROWSER': args.tabs,
+        'IS_HEADLESS': args.headless,
+        'ASSUME_YES': args.yes,
+        'LOG_JSON': args.json_logs,
+        'APPEND_FILE': args.append,
+    }
+    if args.output:
+        output = Path(args.output)
+        named['OUTPUT_FILEPATH'] = str(output.with_suffix(''))
+        named['OUTPUT_EXTENSION'] = output.suffix
+    settings.update({name: str(value) for name, value in named.items() if value is not None})
+
+    for name in settings:
+        if not name.isupper() or not hasattr(constants, name):
+            raise SystemExit(f'Unknown setting {name}')
+        if name in DERIVED_SETTINGS:
+            raise SystemExit(f'Setting {name} is computed from other settings, set {DERIVED_SETTINGS[name]} instead')
+    return {name: parse_value(name, value) for name, value in settings.items()}
+
+
+def apply_settings(settings: dict) -> None:
+    """ Override constants before modules which import them are imported. Also recompute derived settings """
+
+    for name, value in settings.items():
+        setattr(constants, name, value)
+    constants.FILEPATH = Path(constants.OUTPUT_FILEPATH).with_suffix(constants.OUTPUT_EXTENSION)
+    constants.FIELDS = constants.FIELD_PROFILES.get(constants.FIELD_PROFILE, ())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Scrap restaurants and reviews from TripAdvisor. Defaults are in constants.py, '
+                    f'any of them can be overridden by environment variable {ENV_PREFIX}<NAME> or --set NAME=VALUE'
+    )
+    parser.add_argument('--url', help='search page url')
+    parser.add_argument('--max-restaurants', type=int)
+    parser.add_argument('--max-reviews', type=int, help='max reviews per restaurant')
+    parser.add_argument('--output', help='output file, format by extension: .xml or .xlsx')
+    parser.add_argument('--append', action=argparse.BooleanOptionalAction, default=None,
+                        help='append to existing output file (--no-append to replace it)')
+    parser.add_argument('--fields', help='profile of fields from FIELD_PROFILES')
+    parser.add_argument('--tabs', type=int, help='count of workers as tabs of one browser')
+    parser.add_argument('--headless', action='store_true', default=None)
+    parser.add_argument('--json-logs', action='store_true', default=None)
+    parser.add_argument('-y', '--yes', action='store_true', default=None, help='answer "yes" to all questions')
+    parser.add_argument('--set', action='append', metavar='NAME=VALUE', help='override any setting')
+    parser.add_argument('--startup-only', action='store_true',
+                        help='measure cold start (imports and driver start) and exit without scrapping')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    apply_settings(get_settings(args))
+    get_logger(constants.LOG_FILEPATH, constants.LOG_JSON, constants.LOG_MAX_BYTES, constants.LOG_BACKUP_COUNT)
+
+    # scrapper with selenium is imported only now, after settings are applied
+    time_imports = time.perf_counter()
+    import main as scrapper
+    time_imports = time.perf_counter() - time_imports
+
+    if args.startup_only:
+        time_driver = time.perf_counter()
+        scrapper.get_driver().quit()
+        time_driver = time.perf_counter() - time_driver
+        logging.info(f'Cold start: {(time.perf_counter() - START_TIME) * 1000:.0f} ms. '
+                     f'Import of scrapper {time_imports * 1000:.0f} ms, driver start {time_driver * 1000:.0f} ms')
+        return
+
+    logging.info(f'Cold start before driver: {(time.perf_counter() - START_TIME) * 1000:.0f} ms. '
+                 f'Import of scrapper {time_imports * 1000:.0f} ms')
+    scrapper.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,16 @@
-# selenium constants for element path
-from selenium.webdriver.common.by import By
 # to create filepath which not OS dependency
 from pathlib import Path
 
+
+class By:
+    """ Selenium constants for element path, same values as in selenium.webdriver.common.by.By.
+    Defined here, because importing selenium takes long and constants are used by tools without browser
+    """
+    XPATH = 'xpath'
+    CLASS_NAME = 'class name'
+    TAG_NAME = 'tag name'
+
+
 """ Input settings """
 # directing this link first
 URL: str = 'https://www.tripadvisor.ru/Restaurants-g298484-Moscow_Central_Russia.html'
@@ -11,22 +19,137 @@ URL: str = 'https://www.tripadvisor.ru/Restaurants-g298484-Moscow_Central_Russia
 MAX_RESTAURANTS_COUNT: int = 50
 # max count of review per restaurant to scrap
 MAX_REVIEWS_PER_RESTAURANT: int = 10
+# languages of reviews to scrap, values of language filter on restaurant page. ('ALL',) is all languages.
+# Reviews are crawled by every language separately, reviews in other languages are not opened at all
+REVIEW_LANGUAGES: tuple[str, ...] = ('ALL',)
 # extension of output file
 OUTPUT_EXTENSION: str = '.xml'
 # string representation of filename for output file
 OUTPUT_FILEPATH: str = r'output'
 # if True, replace file without asking
 APPEND_FILE: bool = True
+# answer "yes" to all questions while checking input values, for unattended runs
+ASSUME_YES: bool = False
 # define filepath for output file
 FILEPATH: Path = Path(OUTPUT_FILEPATH).with_suffix(OUTPUT_EXTENSION)
 
+""" Fields settings """
+# fields of restaurant
+RESTAURANT_FIELDS: tuple[str, ...] = ('number', 'name', 'URL', 'menu', 'hours', 'restaurant rating')
+# fields of review which are located in reviewer popup after click on avatar
+REVIEWER_FIELDS: tuple[str, ...] = ('username', 'countsReview', 'countExcellent')
+# all fields of review
+REVIEW_FIELDS: tuple[str, ...] = (*REVIEWER_FIELDS, 'review text', 'date of visit', 'translation')
+# named sets of fields to collect. IDs of restaurant and review are always collected.
+# Interactions (popups, "More", translation) are skipped for fields which are not in profile
+FIELD_PROFILES: dict[str, tuple[str, ...]] = {
+    'minimal': ('number', 'name', 'URL', 'restaurant rating'),
+    'reviews-text': ('name', 'review text', 'date of visit'),
+    'full': (*RESTAURANT_FIELDS, *REVIEW_FIELDS),
+}
+# name of profile from FIELD_PROFILES
+FIELD_PROFILE: str = 'full'
+# fields to collect
+FIELDS: tuple[str, ...] = FIELD_PROFILES.get(FIELD_PROFILE, ())
+
+""" Logging settings """
+# file for logs
+LOG_FILEPATH: str = 'scrapper.log'
+# write logs as json lines with extra fields (restaurant id, page, worker, duration)
+LOG_JSON: bool = False
+# rotate log file when it reaches this size, bytes. 0 is no rotation
+LOG_MAX_BYTES: int = 50 * 1024 * 1024
+# count of rotated log files to keep
+LOG_BACKUP_COUNT: int = 5
+
 """ Driver settings """
 # headless mode
 IS_HEADLESS: bool = False
+# page load strategy https://www.selenium.dev/documentation/webdriver/drivers/options/#pageloadstrategy
+# 'normal' waits all subresources (ads too), 'eager' waits only DOM, 'none' doesn't wait at all.
+# Anyway after navigation driver waits until readiness element for page type is located (see PAGE_READINESS)
+PAGE_LOAD_STRATEGY: str = 'eager'
 # implicitly wait https://www.selenium.dev/documentation/webdriver/waits/#implicit-wait
 # this type of wait here because it's relate to every action of element finding
 WAIT_IMPLICITLY: int = 0
 
+""" Concurrency settings """
+# count of workers, every worker has own tab in one shared browser. 1 is no concurrency
+TABS_PER_BROWSER: int = 1
+
+""" Driver recycling settings """
+# recycle driver between restaurants if memory or pages count crossed threshold.
+# Works only without workers in tabs (TABS_PER_BROWSER = 1)
+IS_RECYCLE_DRIVER: bool = True
+# max memory of chromedriver with all chrome processes, MB. 0 to not check
+RECYCLE_MAX_MEMORY_MB: int = 1500
+# max count of loaded pages by one driver. 0 to not check
+RECYCLE_MAX_PAGES: int = 500
+# csv file with memory over time
+MEMORY_LOG_FILEPATH: Path = Path('memory_log.csv')
+
+""" Profiling settings """
+# count and time every webdriver command by type and locator
+IS_PROFILING: bool = False
+# save cProfile stats for every restaurant. Works only if IS_PROFILING is True
+IS_CPROFILE: bool = False
+# file with ranked report of hot selectors and round-trips
+PROFILING_REPORT_FILEPATH: Path = Path('profiling_report.txt')
+# directory for cProfile stats files, one file per restaurant
+CPROFILE_DIRPATH: Path = Path('cprofile')
+
+""" Session store settings """
+# save cookies and local storage of healthy driver and restore them into new driver
+IS_SESSION_STORE: bool = True
+# directory with json file per profile
+SESSION_DIRPATH: Path = Path('sessions')
+# count of profiles, every new driver takes next profile
+SESSION_POOL_SIZE: int = 3
+
+""" Dead-letter queue settings """
+# file with restaurants which failed after all retries. Persisted between runs
+DEAD_LETTER_FILEPATH: Path = Path('dead_letter.json')
+# directory for screenshots and html pages of failed restaurants
+DEAD_LETTER_ARTIFACTS_DIRPATH: Path = Path('dead_letter')
+# count of passes over dead-letter queue with fresh driver after main pass
+DEAD_LETTER_RETRY_PASSES: int = 1
+
+""" Seen reviews settings """
+# skip reviews which were already written in this or earlier runs, their popups are not opened at all
+IS_SKIP_SEEN_REVIEWS: bool = False
+# memory-mapped bloom filter of seen review ids
+SEEN_REVIEWS_BLOOM_FILEPATH: Path = Path('seen_reviews.bloom')
+# exact index of seen review ids, confirms positive answers of bloom filter
+SEEN_REVIEWS_INDEX_FILEPATH: Path = Path('seen_reviews.sqlite')
+# expected count of review ids. Filter size is fixed when file is created, ~7.5 MB for 10 millions with error 0.05
+SEEN_REVIEWS_CAPACITY: int = 10_000_000
+# false positive rate of bloom filter. False positive costs only one lookup in exact index
+SEEN_REVIEWS_ERROR_RATE: float = 0.05
+
+""" Watchdog settings """
+# kill and recycle stuck driver if restaurant or reviews page takes too long
+IS_WATCHDOG: bool = True
+# wall-clock budget for one restaurant, seconds. Restaurant is moved to dead-letter queue after it
+WATCHDOG_RESTAURANT_TIMEOUT: int = 1800
+# wall-clock budget for one page of reviews, seconds. Restaurant is retried with new driver after it
+WATCHDOG_REVIEWS_PAGE_TIMEOUT: int = 300
+# how often watchdog checks deadlines, seconds
+WATCHDOG_CHECK_INTERVAL: float = 1
+
+""" Throughput settings """
+# live status and run report with comparison to previous runs
+IS_THROUGHPUT_REPORT: bool = True
+# status json file, rewritten every STATUS_INTERVAL seconds
+STATUS_FILEPATH: Path = Path('status.json')
+# how often status file is rewritten and progress line is logged, seconds
+STATUS_INTERVAL: float = 30
+# json lines file with summary of every run
+RUNS_HISTORY_FILEPATH: Path = Path('runs_history.jsonl')
+# count of previous runs to compare with
+RUNS_HISTORY_COMPARE: int = 5
+# warn if restaurants per minute is lower than this share of median of previous runs
+THROUGHPUT_DROP_RATIO: float = 0.8
+
 """ SLEEPS AND WAITS """
 # just sleeps from time module. These sleeps block main thread
 # sleep while loading search page
@@ -44,11 +167,14 @@ SLEEP_DRIVER_REFRESH: int = 60
 # sleep after page urllib3.exceptions.MaxRetryError
 SLEEP_RETRY_GET_PAGE: int = 30
 
+# load next search page in background tab while current search page is parsing
+IS_PREFETCH_SEARCH_PAGE: bool = True
+
 # explicit wait https://www.selenium.dev/documentation/webdriver/waits/#explicit-wait
 # waiting if <span class="nav next disabled"> is located on page
 WAIT_IS_LAST_PAGE: int = 1
-# wait until restaurant name is located on page
-WAIT_RESTAURANT_NAME: int = 10
+# wait until readiness element is located on page after navigation
+WAIT_PAGE_READY: int = 20
 # wait for menu url
 WAIT_MENU_URL: int = 2
 # wait for avatar to be clickable
@@ -72,6 +198,32 @@ TIMEOUT_LOADING: int = 20
 # retries number to load page
 RETRIES_LOAD_PAGE: int = 3
 
+""" Scripts executing in browser """
+# get hrefs of all elements located by XPath from single snapshot of DOM
+JS_HREFS_BY_XPATH = '''
+const snapshot = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const hrefs = [];
+for (let i = 0; i < snapshot.snapshotLength; i++) {
+    hrefs.push(snapshot.snapshotItem(i).href);
+}
+return hrefs;
+'''
+# open url in new tab without switching to it
+JS_OPEN_TAB = 'window.open(arguments[0], "_blank");'
+# copy of local storage of current page
+JS_GET_LOCAL_STORAGE = 'return Object.assign({}, window.localStorage);'
+# restore local storage before scripts of page. Formatted with json of origin and json of items.
+# Items which page already has are not overwritten
+JS_SET_LOCAL_STORAGE = '''
+(() => {
+    if (window.location.origin !== %s) return;
+    const items = %s;
+    for (const [key, value] of Object.entries(items)) {
+        if (window.localStorage.getItem(key) === null) window.localStorage.setItem(key, value);
+    }
+})();
+'''
+
 """ Elements attributes to locate them """
 # page title
 TITLE = (By.TAG_NAME, 'title')
@@ -101,12 +253,14 @@ DIVS_SCHEDULE = (By.CLASS_NAME, 'RiEuX')
 # <svg> restaurant rating
 SVG_RESTAURANT_RATING = (By.XPATH, '//*[local-name()="svg"][@aria-label]')
 
-# <span> to change language filter to ALL
-SPAN_LANGUAGE_FILTER_ALL = (
-    By.XPATH, '//div[@data-param="filterLang"]/div[@data-value="ALL"]//span[@class="checkmark"]'
+# <span> to change language filter. Format with language, e.g. "ALL" or "en"
+SPAN_LANGUAGE_FILTER = (
+    By.XPATH, '//div[@data-param="filterLang"]/div[@data-value="{}"]//span[@class="checkmark"]'
 )
-# <input> to indicate if filter ALL was selected
-INPUT_LANGUAGE_FILTER_ALL = (By.XPATH, '//div[@data-param="filterLang"]//input[@value="ALL"]')
+# <input> to indicate if language filter was selected. Format with language, e.g. "ALL" or "en"
+INPUT_LANGUAGE_FILTER = (By.XPATH, '//div[@data-param="filterLang"]//input[@value="{}"]')
+# cookie where site persists selected language filter, named like data-param of filter
+LANGUAGE_FILTER_COOKIE = 'filterLang'
 # <div> which has style display while loading list of reviews
 DIV_LOADING_LIST_REVIEWS = (By.XPATH, '//div[@class="loadingBox"]/parent::div[@id]')
 # tags <div> reviews
@@ -147,3 +301,10 @@ SPAN_TRANSLATE = (By.XPATH, './div/div[@id]/div/div/div/span[@data-url]')
 DIV_TRANSLATION = (By.XPATH, '//span[contains(@class, "ui_overlay ui_modal")]//div[@class="entry"]')
 # <div> to close translation overlay
 DIV_CLOSE_TRANSLATION = (By.XPATH, '//span[contains(@class, "ui_overlay ui_modal")]/div[@class="ui_close_x"]')
+
+# elements which mean that data we need is in DOM, for every page type
+PAGE_READINESS: dict[str, tuple[str, str]] = {
+    'search': A_RESTAURANTS_HREFS,
+    'restaurant': H1_NAME,
+    'reviews': DIV_REVIEW_CONTAINER,
+}
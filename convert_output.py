@@ -0,0 +1,130 @@
+# to run converter from command line
+import argparse
+# logs instead of prints
+import logging
+# reviews are kept in index as json
+import json
+# on-disk index of newest records and pending reviews
+import sqlite3
+# index is temporary file next to output file
+import tempfile
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# logging customization
+from my_logging import get_logger
+# streaming readers and writers of output files. There is no selenium import, so converter starts fast
+from formats import read_restaurants, RestaurantsWriter, EXTENSIONS
+
+
+def create_index(index_filepath: Path) -> sqlite3.Connection:
+    """ On-disk index for deduplication, so memory doesn't grow with count of restaurants and reviews """
+
+    index = sqlite3.connect(index_filepath)
+    index.executescript('''
+        CREATE TABLE restaurants (id TEXT PRIMARY KEY, file INTEGER, record INTEGER) WITHOUT ROWID;
+        CREATE TABLE reviews (id_restaurant TEXT, id_review TEXT, file INTEGER, record INTEGER,
+                              PRIMARY KEY (id_restaurant, id_review)) WITHOUT ROWID;
+        CREATE INDEX reviews_position ON reviews (file, record);
+        -- reviews from older records which have no newer version, in order of reading
+        CREATE TABLE pending_reviews (id_restaurant TEXT, id_review TEXT, data TEXT);
+        CREATE INDEX pending_reviews_restaurant ON pending_reviews (id_restaurant);
+    ''')
+    return index
+
+
+def find_newest(filepaths: list[Path], index: sqlite3.Connection) -> None:
+    """ First pass over files. For every restaurant ID and for every review ID of restaurant save position
+    of its newest record to index: later file and later record in file is newer
+    """
+
+    for i_file, filepath in enumerate(filepaths):
+        for i_record, restaurant_data in enumerate(read_restaurants(filepath)):
+            id_restaurant = restaurant_data['id']
+            index.execute('INSERT OR REPLACE INTO restaurants VALUES (?, ?, ?)', (id_restaurant, i_file, i_record))
+            index.executemany('INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?)', (
+                (id_restaurant, id_review, i_file, i_record) for id_review in restaurant_data.get('reviews', {})
+            ))
+        index.commit()
+
+
+def convert(filepaths: list[Path], output_filepath: Path, is_dedupe: bool = True) -> None:
+    """ Stream restaurants from input files to output file. If is_dedupe, every restaurant is written once
+    at position of its newest record, with newest version of every review from all its records.
+    Positions of newest records and reviews which are missing in newest record are kept in temporary
+    on-disk index, so only one record at the moment is kept in memory
+    """
+
+    with tempfile.TemporaryDirectory(dir=output_filepath.parent) as tmp_dirpath:
+        index = create_index(Path(tmp_dirpath) / 'index.sqlite') if is_dedupe else None
+        try:
+            if index is not None:
+                find_newest(filepaths, index)
+            write_compacted(filepaths, output_filepath, index)
+        finally:
+            if index is not None:
+                index.close()
+
+
+def write_compacted(filepaths: list[Path], output_filepath: Path, index: sqlite3.Connection | None) -> None:
+    """ Second pass over files. Without index every record is written """
+
+    count_records, count_duplicates, count_merged = 0, 0, 0
+
+    with RestaurantsWriter(output_filepath) as writer:
+        for i_file, filepath in enumerate(filepaths):
+            logging.info(f'Reading "{filepath}"')
+            for i_record, restaurant_data in enumerate(read_restaurants(filepath)):
+                count_records += 1
+                if index is None:
+                    writer.write(restaurant_data)
+                    continue
+
+                id_restaurant = restaurant_data['id']
+                newest = index.execute(
+                    'SELECT file, record FROM restaurants WHERE id = ?', (id_restaurant, )
+                ).fetchone()
+                if newest != (i_file, i_record):
+                    count_duplicates += 1
+                    # keep reviews which have no newer version
+                    ids_newest_reviews = {id_review for (id_review, ) in index.execute(
+                        'SELECT id_review FROM reviews WHERE file = ? AND record = ?', (i_file, i_record)
+                    )}
+                    index.executemany('INSERT INTO pending_reviews VALUES (?, ?, ?)', (
+                        (id_restaurant, id_review, json.dumps(review_data, ensure_ascii=False))
+                        for id_review, review_data in restaurant_data.get('reviews', {}).items()
+                        if id_review in ids_newest_reviews
+                    ))
+                    continue
+
+                older_reviews = {id_review: json.loads(data) for id_review, data in index.execute(
+                    'SELECT id_review, data FROM pending_reviews WHERE id_restaurant = ? ORDER BY rowid',
+                    (id_restaurant, )
+                )}
+                if older_reviews:
+                    index.execute('DELETE FROM pending_reviews WHERE id_restaurant = ?', (id_restaurant, ))
+                    count_merged += len(older_reviews)
+                    restaurant_data['reviews'] = {**restaurant_data.get('reviews', {}), **older_reviews}
+                writer.write(restaurant_data)
+
+    logging.info(f'Read {count_records} restaurants records, merged {count_duplicates} old duplicates, '
+                 f'{count_merged} reviews from old duplicates')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Convert and compact output files in constant memory. '
+                    f'Format is defined by extension: {", ".join(EXTENSIONS)}'
+    )
+    parser.add_argument('inputs', nargs='+', type=Path, help='output files, later files are newer')
+    parser.add_argument('-o', '--output', type=Path, required=True, help='converted file')
+    parser.add_argument('--no-dedupe', action='store_true', help='keep all records of restaurants')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    get_logger('convert_output.log')
+    args = parse_args()
+    if args.output in args.inputs:
+        raise SystemExit('Output file must differ from input files')
+    convert(args.inputs, args.output, is_dedupe=not args.no_dedupe)
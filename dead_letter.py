@@ -0,0 +1,109 @@
+# logs instead of prints
+import logging
+# to persist queue between runs
+import json
+# time of failure
+import time
+# traceback of failed restaurant
+import traceback
+# queue is shared between workers
+import threading
+# to create filepath which not OS dependency
+from pathlib import Path
+
+
+class DeadLetterQueue:
+    """ Persisted queue of restaurants urls which failed after all retries.
+    Every item keeps exception, traceback and paths to debug artifacts (screenshot and html)
+    """
+
+    def __init__(self, filepath: Path, artifacts_dirpath: Path):
+        self.filepath = filepath
+        self.artifacts_dirpath = artifacts_dirpath
+        # url -> item dict
+        self.items = {}
+        # statistics for end of run report: pass name -> [attempted, failed]
+        self.stats = {}
+        self.lock = threading.RLock()
+
+        # load items left from previous runs
+        if self.filepath.exists():
+            with open(self.filepath, encoding='utf-8') as f:
+                for item in json.load(f):
+                    self.items[item['url']] = item
+            logging.info(f'Loaded {len(self.items)} failed restaurants from "{self.filepath}"')
+
+    def __len__(self):
+        return len(self.items)
+
+    def urls(self) -> list[str]:
+        """ Urls in queue in order of adding """
+        return list(self.items)
+
+    def push(self, url: str, name: str, ex: Exception, driver=None) -> None:
+        """ Move failed url to queue with exception and debug artifacts.
+        Name is used for artifacts filenames, e.g. restaurant id
+        """
+
+        item = {'url': url, 'attempts': self.items.get(url, {}).get('attempts', 0) + 1}
+        item['time'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        item['exception'] = repr(ex)
+        item['traceback'] = ''.join(traceback.format_exception(ex))
+
+        if driver is not None:
+            stem = self.artifacts_dirpath / name
+            item['screenshot'], item['html'] = save_debug_artifacts(driver, stem)
+
+        with self.lock:
+            self.items[url] = item
+            self.save()
+
+    def remove(self, url: str) -> None:
+        """ Remove url from queue after successful retry """
+        with self.lock:
+            if self.items.pop(url, None) is not None:
+                self.save()
+
+    def save(self) -> None:
+        """ Persist queue to file """
+        with self.lock:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.filepath, 'w', encoding='utf-8') as f:
+                json.dump(list(self.items.values()), f, ensure_ascii=False, indent=2)
+
+    def count(self, pass_name: str, is_failed: bool) -> None:
+        """ Count attempted and failed restaurants for pass """
+        with self.lock:
+            stats = self.stats.setdefault(pass_name, [0, 0])
+            stats[0] += 1
+            stats[1] += is_failed
+
+    def report(self) -> str:
+        """ Failure rates for every pass """
+
+        lines = ['Failures report:']
+        for pass_name, (attempted, failed) in self.stats.items():
+            rate = failed / attempted * 100 if attempted else 0
+            lines.append(f'{pass_name}: failed {failed}/{attempted} ({rate:.1f}%)')
+        lines.append(f'Left in dead-letter queue: {len(self.items)} ("{self.filepath}")')
+        return '\n'.join(lines)
+
+
+def save_debug_artifacts(driver, stem: Path) -> tuple[str | None, str | None]:
+    """ Save screenshot and html page if it possible just to see what's happened.
+    Return paths to saved files
+    """
+
+    screenshot_path, html_path = None, None
+    try:
+        stem.parent.mkdir(parents=True, exist_ok=True)
+        # take screenshot
+        screenshot_path = str(stem.with_suffix('.png'))
+        driver.save_screenshot(screenshot_path)
+        # save html page
+        html_path = str(stem.with_suffix('.html'))
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(driver.page_source)
+    except Exception:
+        pass
+    return screenshot_path, html_path
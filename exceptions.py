@@ -1,2 +1,6 @@
 class LoadingError(Exception):
     """ Error while loading information on page """
+
+
+class HangError(Exception):
+    """ Deadline expired and stuck driver was killed by watchdog """
@@ -0,0 +1,221 @@
+# logs instead of prints
+import logging
+# json lines format
+import json
+# for creating and streaming .xml files
+import xml.etree.ElementTree as ET
+# type hints
+from typing import Iterator, Iterable
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# keys of restaurant data which are not reviews
+from constants import RESTAURANT_FIELDS as RESTAURANT_KEYS
+
+# This module must not import selenium, so tools for outputs start fast.
+# openpyxl is imported only when .xlsx is read or written
+
+# first row of .xlsx output
+XLSX_HEADER = ['Output', 'Restaurant ID', 'Value 1', 'Value 2', 'Value 3']
+# supported extensions of output files
+EXTENSIONS = ('.xml', '.xlsx', '.jsonl')
+
+
+def restaurant_to_element(restaurant_data: dict) -> ET.Element:
+    """ Restaurant data to tag "restaurant". Replace spaces in tag names.
+    Also replace newlines as spaces in reviews texts
+    """
+
+    # define tag "restaurant"
+    restaurant_tag = ET.Element('restaurant')
+
+    for key, value in restaurant_data.items():
+        # replace spaces with underscores
+        key = '_'.join(key.split())
+        # create child under tag "restaurant"
+        child_1 = ET.SubElement(restaurant_tag, key)
+        if key == 'hours':
+            # iterating over hours dict where weekday is key and time range is value
+            for weekday, times_ranges in restaurant_data['hours'].items():
+                for time_range in times_ranges:
+                    # create tag "weekday" under tag "hours"
+                    child_2 = ET.SubElement(child_1, weekday)
+                    # join list of timeranges
+                    child_2.text = ' - '. join(time_range)
+        elif key == 'reviews':
+            # iterate over every review collected for this restaurant
+            for id_review in restaurant_data['reviews']:
+                # create child review under tag "reviews"
+                child_2 = ET.SubElement(child_1, 'review')
+                # create child tag "id" under tag "review"
+                child_3 = ET.SubElement(child_2, 'id')
+                child_3.text = id_review
+                # iterate over keys and values for this review
+                for key_review, value_review in restaurant_data['reviews'][id_review].items():
+                    # replace spaces as underscores
+                    key_review = key_review.replace(' ', '_')
+                    # create child tag under tag "review"
+                    child_3 = ET.SubElement(child_2, key_review)
+                    # replace newlines for not breaking xml structure
+                    child_3.text = value_review.replace('\n', ' ')
+        else:
+            # if value is just str, append it
+            child_1.text = value
+
+    return restaurant_tag
+
+
+def element_to_restaurant(restaurant_tag: ET.Element) -> dict:
+    """ Tag "restaurant" back to restaurant data. Underscores in tag names are spaces in keys """
+
+    restaurant_data = {}
+    for child_1 in restaurant_tag:
+        key = child_1.tag.replace('_', ' ')
+        if key == 'hours':
+            restaurant_data['hours'] = {}
+            for child_2 in child_1:
+                restaurant_data['hours'].setdefault(child_2.tag, []).append((child_2.text or '').split(' - '))
+        elif key == 'reviews':
+            restaurant_data['reviews'] = {}
+            for child_2 in child_1:
+                review_data = {child_3.tag.replace('_', ' '): child_3.text or '' for child_3 in child_2}
+                id_review = review_data.pop('id')
+                restaurant_data['reviews'][id_review] = review_data
+        else:
+            restaurant_data[key] = child_1.text or ''
+    return restaurant_data
+
+
+def restaurant_to_rows(restaurant_data: dict) -> Iterator[list]:
+    """ Restaurant data to rows of .xlsx. Restaurant ID is in second column of every row """
+
+    id_restaurant = restaurant_data['id']
+    # iterate over items
+    for key, value in restaurant_data.items():
+        if key == 'id':
+            continue
+        # value with "hours" key contain dict inside with weekdays as keys and working hours as list
+        if key == 'hours':
+            for weekday, times_ranges in restaurant_data['hours'].items():
+                for time_range in times_ranges:
+                    yield [key, id_restaurant, weekday, *time_range]
+        elif key == 'reviews':
+            # iterate over every review collected for this restaurant
+            for id_review in restaurant_data['reviews']:
+                # review may have no fields, e.g. only reviewer fields requested and reviewer info was not loaded,
+                # but id of review should be saved anyway
+                if not restaurant_data['reviews'][id_review]:
+                    yield ['review', id_restaurant, id_review]
+                # iterate over keys and values for this review
+                for key_review, value_review in restaurant_data['reviews'][id_review].items():
+                    yield [key_review, id_restaurant, id_review, value_review]
+        else:
+            yield [key, id_restaurant, value]
+
+
+def rows_to_restaurants(rows: Iterable[tuple]) -> Iterator[dict]:
+    """ Group rows of .xlsx to restaurants data. Rows of one restaurant are written together,
+    new restaurant starts when restaurant ID changes or restaurant key is repeated (same restaurant scrapped again)
+    """
+
+    restaurant_data = None
+    for row in rows:
+        key, id_restaurant, *values = row
+        # skip header and empty rows
+        if key is None or key == XLSX_HEADER[0]:
+            continue
+        key, id_restaurant = str(key), str(id_restaurant)
+
+        is_repeated_key = restaurant_data is not None and key in RESTAURANT_KEYS and key != 'hours' \
+            and key in restaurant_data
+        if restaurant_data is None or restaurant_data['id'] != id_restaurant or is_repeated_key:
+            if restaurant_data is not None:
+                yield restaurant_data
+            restaurant_data = {'id': id_restaurant}
+
+        if key == 'hours':
+            weekday, *time_range = [value for value in values if value is not None]
+            restaurant_data.setdefault('hours', {}).setdefault(weekday, []).append(time_range)
+        elif key in RESTAURANT_KEYS:
+            restaurant_data[key] = values[0]
+        else:
+            id_review = str(values[0])
+            review_data = restaurant_data.setdefault('reviews', {}).setdefault(id_review, {})
+            # row "review" is review without fields
+            if key != 'review':
+                review_data[key] = values[1] if values[1] is not None else ''
+
+    if restaurant_data is not None:
+        yield restaurant_data
+
+
+def read_restaurants(filepath: Path) -> Iterator[dict]:
+    """ Stream restaurants data from output file. Only one restaurant at the moment is kept in memory """
+
+    if filepath.suffix == '.xml':
+        # root is cleared after every restaurant, otherwise parsed tree grows with file
+        context = ET.iterparse(filepath, events=('start', 'end'))
+        _, root = next(context)
+        for event, element in context:
+            if event == 'end' and element.tag == 'restaurant':
+                yield element_to_restaurant(element)
+                root.clear()
+    elif filepath.suffix == '.xlsx':
+        import openpyxl
+        wb = openpyxl.load_workbook(filepath, read_only=True)
+        try:
+            yield from rows_to_restaurants(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+    elif filepath.suffix == '.jsonl':
+        with open(filepath, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f'Unsupported extension of {filepath}. Expected one of {EXTENSIONS}')
+
+
+class RestaurantsWriter:
+    """ Stream restaurants data to output file without keeping written data in memory """
+
+    def __init__(self, filepath: Path):
+        self.filepath = filepath
+        if filepath.suffix not in EXTENSIONS:
+            raise ValueError(f'Unsupported extension of {filepath}. Expected one of {EXTENSIONS}')
+        self.count = 0
+
+    def __enter__(self):
+        if self.filepath.suffix == '.xlsx':
+            import openpyxl
+            # write-only workbook flushes rows to disk instead of keeping cells in memory
+            self.wb = openpyxl.Workbook(write_only=True)
+            self.ws = self.wb.create_sheet()
+            self.ws.append(XLSX_HEADER)
+        else:
+            self.f = open(self.filepath, 'w', encoding='utf-8')
+            if self.filepath.suffix == '.xml':
+                self.f.write("<?xml version='1.0' encoding='utf-8'?>\n<data>\n")
+        return self
+
+    def write(self, restaurant_data: dict) -> None:
+        if self.filepath.suffix == '.xml':
+            restaurant_tag = restaurant_to_element(restaurant_data)
+            # set indent as "tab" like in to_xml()
+            ET.indent(restaurant_tag, space='\t', level=1)
+            self.f.write('\t' + ET.tostring(restaurant_tag, encoding='unicode') + '\n')
+        elif self.filepath.suffix == '.xlsx':
+            for row in restaurant_to_rows(restaurant_data):
+                self.ws.append(row)
+        else:
+            self.f.write(json.dumps(restaurant_data, ensure_ascii=False) + '\n')
+        self.count += 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.filepath.suffix == '.xlsx':
+            self.wb.save(self.filepath)
+        else:
+            if self.filepath.suffix == '.xml':
+                self.f.write('</data>')
+            self.f.close()
+        logging.info(f'Written {self.count} restaurants to "{self.filepath}"')
@@ -1,17 +1,25 @@
-# for working with Microsoft Excel documents
-import openpyxl
 # logs instead of prints
 import logging
+# to check if program is running interactively
+import sys
 # for creating .xml file
 import xml.etree.ElementTree as ET
 
+# restaurant data to rows of .xlsx and tags of .xml
+from formats import restaurant_to_rows, restaurant_to_element, XLSX_HEADER
+
 from constants import (
     URL,
     OUTPUT_EXTENSION,
     FILEPATH,
     MAX_RESTAURANTS_COUNT,
     MAX_REVIEWS_PER_RESTAURANT,
-    APPEND_FILE
+    REVIEW_LANGUAGES,
+    APPEND_FILE,
+    ASSUME_YES,
+    FIELD_PROFILES,
+    FIELD_PROFILE,
+    PAGE_LOAD_STRATEGY
 )
 
 
@@ -21,6 +29,14 @@ def check_input_values():
     def check_user_answer(question: str) -> bool:
         """ Ask user question and exit program at all if answer is 'no' """
 
+        # unattended run, nobody can answer
+        if ASSUME_YES:
+            logging.info(f'{question}\nAnswer: y (ASSUME_YES=True)')
+            return True
+        if not sys.stdin.isatty():
+            logging.error(f'{question}\nCan\'t ask in non-interactive run. Set ASSUME_YES (--yes) to answer "y"')
+            exit()
+
         new_file = input(f'{question}\nEnter answer: ')
         # answer will be checked in lower case
         if new_file.lower() == 'y':
@@ -32,10 +48,11 @@ def check_input_values():
 
     # Check variable URL is object of str class and starts like link to tripadvisor
     if isinstance(URL, str):
-        if URL.startswith('https://www.tripadvisor'):
+        # local mock server (mock_server.py) is allowed for load testing
+        if URL.startswith(('https://www.tripadvisor', 'http://127.0.0.1', 'http://localhost')):
             pass
         else:
-            logging.error(f'{URL=}\nURL should be directing to tripadvisor domain.')
+            logging.error(f'{URL=}\nURL should be directing to tripadvisor domain or to local mock server.')
             exit()
     else:
         logging.error(f'{URL=}\nExpected variable URL with type str.')
@@ -51,6 +68,23 @@ def check_input_values():
         logging.error(f'{MAX_REVIEWS_PER_RESTAURANT=}\nExpected variable MAX_REVIEWS_PER_RESTAURANT with type int.')
         exit()
 
+    # Check variable REVIEW_LANGUAGES is not empty tuple of str
+    if not isinstance(REVIEW_LANGUAGES, tuple) or not REVIEW_LANGUAGES or \
+            not all(isinstance(language, str) and language for language in REVIEW_LANGUAGES):
+        logging.error(f'{REVIEW_LANGUAGES=}\nExpected variable REVIEW_LANGUAGES is not empty tuple of str, '
+                      f'e.g. ("ALL",) or ("en", "de")')
+        exit()
+
+    # Check variable FIELD_PROFILE is name of one of FIELD_PROFILES
+    if FIELD_PROFILE not in FIELD_PROFILES:
+        logging.error(f'{FIELD_PROFILE=}\nExpected variable FIELD_PROFILE is one of {list(FIELD_PROFILES)}')
+        exit()
+
+    # Check variable PAGE_LOAD_STRATEGY is one of strategies supported by webdriver
+    if PAGE_LOAD_STRATEGY not in ('normal', 'eager', 'none'):
+        logging.error(f'{PAGE_LOAD_STRATEGY=}\nExpected variable PAGE_LOAD_STRATEGY would be "normal", "eager" or "none"')
+        exit()
+
     # Check variable OUTPUT_EXTENSION is object of str and starts with dot
     if isinstance(OUTPUT_EXTENSION, str):
         if OUTPUT_EXTENSION.startswith('.'):
@@ -84,10 +118,12 @@ def check_input_values():
 
         # if we are here, replacing (or creating new) file
         if OUTPUT_EXTENSION == '.xlsx':
+            # for working with Microsoft Excel documents. Imported only for .xlsx output, it takes long
+            import openpyxl
             # creating workbook
             wb = openpyxl.Workbook()
             # append first row to workbook
-            wb.active.append(['Output', 'Restaurant ID', 'Value 1', 'Value 2', 'Value 3'])
+            wb.active.append(XLSX_HEADER)
             # save changes to file
             wb.save(FILEPATH)
         elif OUTPUT_EXTENSION == '.xml':
@@ -108,35 +144,14 @@ def to_excel(restaurant_data: dict) -> None:
      File must exist because it's creating while checking APPEND_FILE
      """
 
+    # for working with Microsoft Excel documents. Imported only for .xlsx output, it takes long
+    import openpyxl
     # load workbook
     wb = openpyxl.load_workbook(FILEPATH)
 
-    # extract id from dict
-    id_restaurant = restaurant_data.pop('id')
-    # iterate over items
-    for key, value in restaurant_data.items():
-        # value with "hours" key contain dict inside with weekdays as keys and working hours as list
-        if key == 'hours':
-            for weekday, times_ranges in restaurant_data['hours'].items():
-                for time_range in times_ranges:
-                    # define row
-                    row = [key, id_restaurant, weekday, *time_range]
-                    # append row to workbook
-                    wb.active.append(row)
-        elif key == 'reviews':
-            # iterate over every review collected for this restaurant
-            for id_review in restaurant_data['reviews']:
-                # iterate over keys and values for this review
-                for key_review, value_review in restaurant_data['reviews'][id_review].items():
-                    # define row
-                    row = [key_review, id_restaurant, id_review, value_review]
-                    # append row to workbook
-                    wb.active.append(row)
-        else:
-            # define row
-            row = [key, id_restaurant, value]
-            # append row to workbook
-            wb.active.append(row)
+    # append every row of restaurant to workbook
+    for row in restaurant_to_rows(restaurant_data):
+        wb.active.append(row)
 
     # save changes to workbook
     wb.save(FILEPATH)
@@ -150,43 +165,8 @@ def to_xml(restaurant_data: dict) -> None:
 
     # parse existing file
     tree = ET.parse(FILEPATH)
-    # get root "data" tag
-    root = tree.getroot()
-    # define tag "restaurant"
-    restaurant_tag = ET.SubElement(root, 'restaurant')
-
-    for key, value in restaurant_data.items():
-        # replace spaces with underscores
-        key = '_'.join(key.split())
-        # create child under tag "restaurant"
-        child_1 = ET.SubElement(restaurant_tag, key)
-        if key == 'hours':
-            # iterating over hours dict where weekday is key and time range is value
-            for weekday, times_ranges in restaurant_data['hours'].items():
-                for time_range in times_ranges:
-                    # create tag "weekday" under tag "hours"
-                    child_2 = ET.SubElement(child_1, weekday)
-                    # join list of timeranges
-                    child_2.text = ' - '. join(time_range)
-        elif key == 'reviews':
-            # iterate over every review collected for this restaurant
-            for id_review in restaurant_data['reviews']:
-                # create child review under tag "reviews"
-                child_2 = ET.SubElement(child_1, 'review')
-                # create child tag "id" under tag "review"
-                child_3 = ET.SubElement(child_2, 'id')
-                child_3.text = id_review
-                # iterate over keys and values for this review
-                for key_review, value_review in restaurant_data['reviews'][id_review].items():
-                    # replace spaces as underscores
-                    key_review = key_review.replace(' ', '_')
-                    # create child tag under tag "review"
-                    child_3 = ET.SubElement(child_2, key_review)
-                    # replace newlines for not breaking xml structure
-                    child_3.text = value_review.replace('\n', ' ')
-        else:
-            # if value is just str, append it
-            child_1.text = value
+    # get root "data" tag and append tag "restaurant"
+    tree.getroot().append(restaurant_to_element(restaurant_data))
 
     # set indent as "tab"
     ET.indent(tree, space='\t')
@@ -4,6 +4,10 @@ import time
 import logging
 # regular expressions to get id_restaurant from URL
 import re
+# workers in tabs of one browser
+import threading
+# to create filepath which not OS dependency
+from pathlib import Path
 
 # selenium driver
 from selenium import webdriver
@@ -21,10 +25,9 @@ from selenium.common.exceptions import (
     NoSuchElementException,
     TimeoutException,
     StaleElementReferenceException,
-    ElementClickInterceptedException
+    ElementClickInterceptedException,
+    WebDriverException
 )
-# for auto installation of webdriver
-from webdriver_manager.chrome import ChromeDriverManager
 
 # logging customization
 from my_logging import get_logger
@@ -35,16 +38,84 @@ from in_out_methods import (
     to_xml
 )
 # custom exceptions
-from exceptions import LoadingError
+from exceptions import LoadingError, HangError
+# webdriver commands accounting
+from profiling import CommandProfiler
+# failed restaurants queue
+from dead_letter import DeadLetterQueue, save_debug_artifacts
+# deadlines for restaurant and reviews page
+from watchdog import Watchdog
+# to kill stuck driver
+from processes import kill_process_tree
+# several workers in tabs of one browser
+from tabs import TabScheduler
+# proactive driver recycling
+from recycle import RecyclePolicy
+# persistent set of review ids from earlier runs
+from seen_reviews import SeenReviews
+# live status, progress and run report
+from throughput import ThroughputMonitor
+# cookies and local storage reused by new drivers
+from session_store import SessionStore
 from constants import (
     URL,
     MAX_RESTAURANTS_COUNT,
     MAX_REVIEWS_PER_RESTAURANT,
+    REVIEW_LANGUAGES,
     OUTPUT_EXTENSION,
 
+    FIELD_PROFILE,
+    FIELDS,
+    REVIEWER_FIELDS,
+    REVIEW_FIELDS,
+
+    LOG_FILEPATH,
+    LOG_JSON,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+
     IS_HEADLESS,
+    PAGE_LOAD_STRATEGY,
     WAIT_IMPLICITLY,
 
+    TABS_PER_BROWSER,
+
+    IS_RECYCLE_DRIVER,
+    RECYCLE_MAX_MEMORY_MB,
+    RECYCLE_MAX_PAGES,
+    MEMORY_LOG_FILEPATH,
+
+    IS_PROFILING,
+    IS_CPROFILE,
+    PROFILING_REPORT_FILEPATH,
+    CPROFILE_DIRPATH,
+
+    DEAD_LETTER_FILEPATH,
+    DEAD_LETTER_ARTIFACTS_DIRPATH,
+    DEAD_LETTER_RETRY_PASSES,
+
+    IS_SESSION_STORE,
+    SESSION_DIRPATH,
+    SESSION_POOL_SIZE,
+
+    IS_SKIP_SEEN_REVIEWS,
+    SEEN_REVIEWS_BLOOM_FILEPATH,
+    SEEN_REVIEWS_INDEX_FILEPATH,
+    SEEN_REVIEWS_CAPACITY,
+    SEEN_REVIEWS_ERROR_RATE,
+
+    IS_THROUGHPUT_REPORT,
+    STATUS_FILEPATH,
+    STATUS_INTERVAL,
+    RUNS_HISTORY_FILEPATH,
+    RUNS_HISTORY_COMPARE,
+    THROUGHPUT_DROP_RATIO,
+
+    IS_WATCHDOG,
+    WATCHDOG_RESTAURANT_TIMEOUT,
+    WATCHDOG_REVIEWS_PAGE_TIMEOUT,
+    WATCHDOG_CHECK_INTERVAL,
+
     SLEEP_SEARCH,
     SLEEP_RESTAURANT,
     SLEEP_REVIEWS_PAGE,
@@ -53,8 +124,10 @@ from constants import (
     SLEEP_DRIVER_REFRESH,
     SLEEP_RETRY_GET_PAGE,
 
+    IS_PREFETCH_SEARCH_PAGE,
+
+    WAIT_PAGE_READY,
     WAIT_IS_LAST_PAGE,
-    WAIT_RESTAURANT_NAME,
     WAIT_MENU_URL,
     WAIT_AVATAR,
     WAIT_USERNAME,
@@ -68,6 +141,11 @@ from constants import (
 
     RETRIES_LOAD_PAGE,
 
+    JS_HREFS_BY_XPATH,
+    JS_OPEN_TAB,
+    JS_GET_LOCAL_STORAGE,
+    JS_SET_LOCAL_STORAGE,
+
     TITLE,
     A_RESTAURANTS_HREFS,
     A_NEXT_SEARCH_PAGE,
@@ -83,8 +161,9 @@ from constants import (
     SVG_RESTAURANT_RATING,
 
     DIV_REVIEW_CONTAINER,
-    SPAN_LANGUAGE_FILTER_ALL,
-    INPUT_LANGUAGE_FILTER_ALL,
+    SPAN_LANGUAGE_FILTER,
+    INPUT_LANGUAGE_FILTER,
+    LANGUAGE_FILTER_COOKIE,
     DIV_AVATAR,
     SPAN_REVIEWER_INFO,
     DIV_LOADING_LIST_REVIEWS,
@@ -99,9 +178,32 @@ from constants import (
     DIV_DATE_VISIT,
     SPAN_TRANSLATE,
     DIV_TRANSLATION,
-    DIV_CLOSE_TRANSLATION
+    DIV_CLOSE_TRANSLATION,
+    PAGE_READINESS
 )
 
+# profiler is shared between all drivers, because driver can be rebooted while scrapping
+profiler = CommandProfiler(IS_CPROFILE, CPROFILE_DIRPATH) if IS_PROFILING else None
+# watchdog is started in collect_data()
+watchdog = None
+# seen reviews are opened in collect_data()
+seen_reviews = None
+# throughput monitor is started in collect_data()
+throughput = None
+# dispatch commands of workers to their own tabs
+tab_scheduler = TabScheduler() if TABS_PER_BROWSER > 1 else None
+# recycle driver by memory and pages count. Driver is shared between workers with tabs,
+# so there is no safe point to recycle it
+recycle_policy = RecyclePolicy(RECYCLE_MAX_MEMORY_MB, RECYCLE_MAX_PAGES, MEMORY_LOG_FILEPATH) \
+    if IS_RECYCLE_DRIVER and not tab_scheduler else None
+# sessions are restored into every new driver, driver can be rebooted while scrapping
+session_store = SessionStore(SESSION_DIRPATH, SESSION_POOL_SIZE, JS_GET_LOCAL_STORAGE, JS_SET_LOCAL_STORAGE) \
+    if IS_SESSION_STORE else None
+# workers append data to the same output file
+output_lock = threading.Lock()
+# only one worker can reboot shared driver
+reboot_lock = threading.Lock()
+
 
 def get_driver() -> webdriver.Chrome:
     """ Define settings, driver path using webdriver-manager, initialize Chrome driver"""
@@ -114,15 +216,60 @@ def get_driver() -> webdriver.Chrome:
     options.headless = IS_HEADLESS
     # maximize window
     options.add_argument('--start-maximized')
+    # don't wait all subresources while page loading
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    # for auto installation of webdriver. Imported here, because it's needed only to start browser
+    from webdriver_manager.chrome import ChromeDriverManager
     # get driver path using webdriver-manager
     driver_path = ChromeDriverManager().install()
     # initialize chrome webdriver
     _driver = webdriver.Chrome(service=Service(driver_path), options=options)
     # set implicitly wait
     _driver.implicitly_wait(WAIT_IMPLICITLY)
+    # count and time every command of this driver
+    if profiler:
+        profiler.attach(_driver)
+    # every worker gets own tab in this driver
+    if tab_scheduler:
+        tab_scheduler.attach(_driver)
+    # count pages for this driver from zero
+    if recycle_policy:
+        recycle_policy.reset()
+    # cookies and local storage of next profile, before first page is loaded
+    if session_store:
+        session_store.restore(_driver)
     return _driver
 
 
+def sleep(seconds: float) -> None:
+    """ time.sleep() which is accounted as time lost to sleeps in throughput report """
+    time.sleep(seconds)
+    if throughput:
+        throughput.add_sleep(seconds)
+
+
+def get_page(url: str, page_type: str) -> bool:
+    """ Direct url and wait until readiness element for page type is located on page.
+    Return False if it was not located in time
+    """
+
+    # make global driver variable visible in this func
+    global driver
+
+    driver.get(url)
+    if recycle_policy:
+        recycle_policy.count_page()
+
+    try:
+        WebDriverWait(driver, timeout=WAIT_PAGE_READY).until(
+            ec.presence_of_element_located(PAGE_READINESS[page_type])
+        )
+        return True
+    except TimeoutException:
+        logging.warning(f'Page is not ready after {WAIT_PAGE_READY} seconds. {page_type=} {url=}')
+        return False
+
+
 def get_urls_restaurants() -> list[str]:
     """ Collect restaurants urls from search page """
 
@@ -131,57 +278,107 @@ def get_urls_restaurants() -> list[str]:
 
     # define list which will be returned with restaurants urls
     urls_restaurants = []
+    # handle of tab where next search page is loading in background
+    handle_next_page = None
 
-    while True:
-        # sleep
-        time.sleep(SLEEP_SEARCH)
-        # get count of collected urls to compare after finding elements
-        count_urls_before = len(urls_restaurants)
-
-        # if page is single there is no button for next page
-        is_only_one_page, page = is_single_page()
-
-        # while FIRST search page loading, first located list of restaurants that we needed,
-        # after that list is loading "Delivery Available", "Outdoor Seating Available" etc...
-        # so first we got needed elements, but after other elements loaded,
-        # location for list of restaurants changes, and we need to find them again
-        # p.s. this extra list with "Delivery..." and others only on first search page
-        try:
-            # iterating over tags <a> which contains hrefs to restaurants
-            for tag_a in driver.find_elements(*A_RESTAURANTS_HREFS):
+    try:
+        while True:
+            # sleep
+            sleep(SLEEP_SEARCH)
+            # get count of collected urls to compare after finding elements
+            count_urls_before = len(urls_restaurants)
+
+            # if page is single there is no button for next page
+            is_only_one_page, page = is_single_page()
+
+            # start loading next search page while this page is parsing
+            if IS_PREFETCH_SEARCH_PAGE and not is_only_one_page and handle_next_page is None:
+                handle_next_page = prefetch_next_search_page()
+
+            # while FIRST search page loading, first located list of restaurants that we needed,
+            # after that list is loading "Delivery Available", "Outdoor Seating Available" etc...
+            # so first we got needed elements, but after other elements loaded,
+            # location for list of restaurants changes. Hrefs are extracted from single snapshot of DOM,
+            # so it's not a problem anymore (no StaleElementReferenceException)
+            # p.s. this extra list with "Delivery..." and others only on first search page
+            for url_to_restaurant in get_hrefs(A_RESTAURANTS_HREFS):
                 # compare count of restaurants with constant value
                 if len(urls_restaurants) == MAX_RESTAURANTS_COUNT:
                     return urls_restaurants
 
-                # extract href attribute
-                url_to_restaurant = tag_a.get_attribute('href')
                 # append href to list if it's not in it already
                 if url_to_restaurant not in urls_restaurants:
                     urls_restaurants.append(url_to_restaurant)
-        except StaleElementReferenceException:
-            # elements changed position on the DOM
-            pass
 
-        # check if we collected any new urls. This solution to avoid especially configured
-        # time.sleep() value. Waits until any not seen elements will be located on search page
-        if count_urls_before == len(urls_restaurants):
-            continue
-        logging.info(f'{page=}. Collected {len(urls_restaurants)} restaurants urls')
+            # check if we collected any new urls. This solution to avoid especially configured
+            # time.sleep() value. Waits until any not seen elements will be located on search page
+            if count_urls_before == len(urls_restaurants):
+                continue
+            logging.info(f'{page=}. Collected {len(urls_restaurants)} restaurants urls',
+                         extra={'page': page, 'count': len(urls_restaurants)})
 
-        # if page is single return collected urls
-        if is_only_one_page:
-            return urls_restaurants
+            # if page is single return collected urls
+            if is_only_one_page:
+                return urls_restaurants
 
-        try:
-            # explicit wait of element until page loads
-            WebDriverWait(driver, timeout=WAIT_IS_LAST_PAGE).until(
-                ec.presence_of_element_located(SPAN_IS_LAST_SEARCH_PAGE)
-            )
-            # if page is last return list of urls
-            return urls_restaurants
-        except TimeoutException:
-            # click the button next page search result
-            driver.find_element(*A_NEXT_SEARCH_PAGE).click()
+            try:
+                # explicit wait of element until page loads
+                WebDriverWait(driver, timeout=WAIT_IS_LAST_PAGE).until(
+                    ec.presence_of_element_located(SPAN_IS_LAST_SEARCH_PAGE)
+                )
+                # if page is last return list of urls
+                return urls_restaurants
+            except TimeoutException:
+                if handle_next_page:
+                    # next page already loading in background tab, close current tab and switch to it
+                    driver.close()
+                    driver.switch_to.window(handle_next_page)
+                    handle_next_page = None
+                else:
+                    # click the button next page search result
+                    driver.find_element(*A_NEXT_SEARCH_PAGE).click()
+    finally:
+        # prefetched page is not needed anymore
+        if handle_next_page:
+            handle_current_page = driver.current_window_handle
+            driver.switch_to.window(handle_next_page)
+            driver.close()
+            driver.switch_to.window(handle_current_page)
+
+
+def get_hrefs(element_path: tuple[str, str]) -> list[str]:
+    """ Get hrefs of all elements located by XPath from single snapshot of DOM.
+    One webdriver command instead of command per element
+    """
+
+    # define driver as global variable
+    global driver
+
+    return driver.execute_script(JS_HREFS_BY_XPATH, element_path[1])
+
+
+def prefetch_next_search_page() -> str | None:
+    """ Open next search page in new tab without switching to it, so it loads in background.
+    Return handle of new tab or None if there is no href to next page
+    """
+
+    # define driver as global variable
+    global driver
+
+    hrefs_next_page = get_hrefs(A_NEXT_SEARCH_PAGE)
+    if not hrefs_next_page:
+        return None
+
+    handles_before = set(driver.window_handles)
+    driver.execute_script(JS_OPEN_TAB, hrefs_next_page[0])
+    # new tab may be not opened if popup was blocked
+    handles_new = set(driver.window_handles) - handles_before
+    return handles_new.pop() if handles_new else None
+
+
+def get_id_restaurant(url: str) -> str:
+    """ Get restaurant ID from url using regular expression """
+    return re.search(r'(?<=-d)\d+(?=-)', url).group(0)
 
 
 def collect_restaurant_data(url: str, restaurant_data: dict = None) -> dict:
@@ -194,30 +391,47 @@ def collect_restaurant_data(url: str, restaurant_data: dict = None) -> dict:
     if restaurant_data is None:
         restaurant_data = {}
 
-    # get restaurant ID using regular expression
-    id_restaurant = re.search(r'(?<=-d)\d+(?=-)', url).group(0)
+    # get restaurant ID from url
+    id_restaurant = get_id_restaurant(url)
     restaurant_data['id'] = id_restaurant
 
     # load restaurant page with retries
     for retry in range(1, RETRIES_LOAD_PAGE+1):
+        # driver of this attempt, other worker may replace shared driver meanwhile
+        attempt_driver = driver
         try:
-            driver.get(url)
+            if not get_page(url, 'restaurant'):
+                raise LoadingError('Restaurant page is not ready')
             # sleep until restaurant page loading
-            time.sleep(SLEEP_RESTAURANT)
+            sleep(SLEEP_RESTAURANT)
 
             # data collecting
             restaurant_data = get_restaurant_info(restaurant_data)
-            restaurant_data['reviews'] = get_reviews_info(id_restaurant)
+            # reviews pages are not directed at all if no review field requested
+            if set(FIELDS) & set(REVIEW_FIELDS):
+                restaurant_data['reviews'] = get_reviews_info(id_restaurant)
 
             # break loop if no error while loading page
             break
         except Exception as ex:
+            # watchdog killed stuck driver, so new driver is needed for anything else
+            event = watchdog.pop_fired() if watchdog else None
+            if event:
+                reboot_driver(attempt_driver)
+                # restaurant budget of this thread is over, move on
+                if event['name'] == 'restaurant':
+                    raise HangError(f'Restaurant took more than {event["timeout"]} seconds') from ex
+            elif not is_driver_alive(attempt_driver):
+                # crashed browser, or browser killed by deadline of other worker
+                reboot_driver(attempt_driver, seconds=0)
+
             if retry == RETRIES_LOAD_PAGE:
                 logging.error(f'Last retry №:{RETRIES_LOAD_PAGE}.\n{ex}', exc_info=True)
-                exit(1)
+                # restaurant will be moved to dead-letter queue in collect_data()
+                raise
             else:
                 logging.warning(f'Retry №:{RETRIES_LOAD_PAGE}. Try loading {url=}\n{ex}', exc_info=True)
-            time.sleep(SLEEP_RETRY_GET_PAGE)
+            sleep(SLEEP_RETRY_GET_PAGE)
 
     return restaurant_data
 
@@ -228,51 +442,48 @@ def get_restaurant_info(restaurant_data: dict) -> dict:
     # make global driver variable visible in this func
     global driver
 
-    # wait until restaurant <h1> tag with name is located on page.
-    # here is no data appending to keep order in dict, just waiting until name is located
-    try:
-        WebDriverWait(driver, timeout=WAIT_RESTAURANT_NAME).until(
-            ec.presence_of_element_located(H1_NAME)
-        )
-    except TimeoutException:
-        raise LoadingError('No RESTAURANT_NAME on page')
-
     # rating number in search
-    try:
-        rating_number = driver.find_element(*B_RATING_NUMBER).text
-        restaurant_data['number'] = rating_number
-    except NoSuchElementException:
-        pass
+    if 'number' in FIELDS:
+        try:
+            rating_number = driver.find_element(*B_RATING_NUMBER).text
+            restaurant_data['number'] = rating_number
+        except NoSuchElementException:
+            pass
 
     # name of restaurant
-    try:
-        name = driver.find_element(*H1_NAME).text
-        restaurant_data['name'] = name
-    except NoSuchElementException:
-        pass
+    if 'name' in FIELDS:
+        try:
+            name = driver.find_element(*H1_NAME).text
+            restaurant_data['name'] = name
+        except NoSuchElementException:
+            pass
 
     # restaurant url
-    restaurant_data['URL'] = URL
+    if 'URL' in FIELDS:
+        restaurant_data['URL'] = URL
 
     # url for menu
-    try:
-        # attribute href appending to <a> after some time
-        a_menu = WebDriverWait(driver, timeout=WAIT_MENU_URL).until(
-            ec.element_to_be_clickable(A_MENU)
-        )
-        url_menu = a_menu.get_attribute('href')
-        restaurant_data['menu'] = url_menu
-    except TimeoutException:
-        pass
+    if 'menu' in FIELDS:
+        try:
+            # attribute href appending to <a> after some time
+            a_menu = WebDriverWait(driver, timeout=WAIT_MENU_URL).until(
+                ec.element_to_be_clickable(A_MENU)
+            )
+            url_menu = a_menu.get_attribute('href')
+            restaurant_data['menu'] = url_menu
+        except TimeoutException:
+            pass
 
     # get working hours
-    try:
-        # press button to get full schedule
-        driver.find_element(*BUTTON_POPUP_SCHEDULE).click()
-        is_schedule_exists = True
-    except NoSuchElementException:
-        # schedule does not exists
-        is_schedule_exists = False
+    is_schedule_exists = False
+    if 'hours' in FIELDS:
+        try:
+            # press button to get full schedule
+            driver.find_element(*BUTTON_POPUP_SCHEDULE).click()
+            is_schedule_exists = True
+        except NoSuchElementException:
+            # schedule does not exists
+            pass
 
     if is_schedule_exists:
         # iterate over every div with hours in schedule
@@ -298,43 +509,102 @@ def get_restaurant_info(restaurant_data: dict) -> dict:
         driver.find_element(*BUTTON_POPUP_SCHEDULE).click()
 
     # restaurant rating
-    try:
-        restaurant_rating = driver.find_element(*SVG_RESTAURANT_RATING).get_attribute('aria-label')
-        restaurant_data['restaurant rating'] = restaurant_rating
-    except NoSuchElementException:
-        pass
+    if 'restaurant rating' in FIELDS:
+        try:
+            restaurant_rating = driver.find_element(*SVG_RESTAURANT_RATING).get_attribute('aria-label')
+            restaurant_data['restaurant rating'] = restaurant_rating
+        except NoSuchElementException:
+            pass
 
     return restaurant_data
 
 
 def get_reviews_info(id_restaurant: str) -> dict:
-    """ Collect reviews for this restaurant. Append values to already existing lists """
+    """ Collect reviews for this restaurant. Reviews are crawled by every language from REVIEW_LANGUAGES """
 
     # make global driver variable visible in this func
     global driver
 
     # define dict with all reviews data
     reviews_data = {}
-    # define counter for case if for loop is empty
-    count_reviews = 0
-    # page_before may be defined later after "Access Denied", it's to skip already seen pages
-    page_before = None
 
     # check if any review exists on page
     if len(driver.find_elements(*DIV_REVIEW_CONTAINER)) == 0:
-        logging.info(f'0 reviews for {id_restaurant=}')
+        logging.info(f'0 reviews for {id_restaurant=}', extra={'id_restaurant': id_restaurant, 'count': 0})
         return {}
 
-    while True:
+    for language in REVIEW_LANGUAGES:
+        # reviews count is equal max limit
+        if MAX_REVIEWS_PER_RESTAURANT == len(reviews_data):
+            break
+        get_reviews_by_language(id_restaurant, language, reviews_data)
+
+    return reviews_data
 
-        # check if langauge filter was selected to "ALL languages"
-        if not driver.find_element(*INPUT_LANGUAGE_FILTER_ALL).is_selected():
-            # change language filter to "ALL languages"
-            WebDriverWait(driver, timeout=WAIT_CHANGE_FILTER).until(
-                ec.element_to_be_clickable(SPAN_LANGUAGE_FILTER_ALL)
-            ).click()
-            # mini-sleep to wait div loading located on page
-            time.sleep(SLEEP_WAIT_LOADING_TAG)
+
+def apply_language_filter(language: str) -> bool:
+    """ Select language filter if it is not selected yet. Return False if there is no such language in filter """
+
+    # make global driver variable visible in this func
+    global driver
+
+    try:
+        input_language = driver.find_element(
+            INPUT_LANGUAGE_FILTER[0], INPUT_LANGUAGE_FILTER[1].format(language)
+        )
+    except NoSuchElementException:
+        return False
+
+    # check if language filter was selected
+    if not input_language.is_selected():
+        # change language filter
+        WebDriverWait(driver, timeout=WAIT_CHANGE_FILTER).until(
+            ec.element_to_be_clickable((SPAN_LANGUAGE_FILTER[0], SPAN_LANGUAGE_FILTER[1].format(language)))
+        ).click()
+        # mini-sleep to wait div loading located on page
+        sleep(SLEEP_WAIT_LOADING_TAG)
+    return True
+
+
+def set_language_filter_cookie(url: str, language: str) -> None:
+    """ Set preference cookie of language filter for site of url. Set with devtools protocol,
+    because selenium can add cookies only for opened domain, and new driver has no page yet
+    """
+
+    # make global driver variable visible in this func
+    global driver
+
+    driver.execute_cdp_cmd('Network.setCookie', {'name': LANGUAGE_FILTER_COOKIE, 'value': language, 'url': url})
+
+
+def get_reviews_by_language(id_restaurant: str, language: str, reviews_data: dict) -> None:
+    """ Collect reviews in one language for this restaurant. Append values to already existing reviews_data """
+
+    # make global driver variable visible in this func
+    global driver
+
+    # define counter for case if for loop is empty
+    count_reviews = len(reviews_data)
+    # page_before may be defined later after "Access Denied", it's to skip already seen pages
+    page_before = None
+    # filter is applied once, it stays selected on next pages. After reboot it's only checked,
+    # because new driver gets it with preference cookie
+    is_filter_applied = False
+
+    while True:
+        # set budget for this page of reviews
+        if watchdog:
+            watchdog.arm('reviews page', WATCHDOG_REVIEWS_PAGE_TIMEOUT)
+        start_page = time.perf_counter()
+        # driver of this page, other worker may replace shared driver meanwhile
+        page_driver = driver
+
+        # select language filter once
+        if not is_filter_applied:
+            if not apply_language_filter(language):
+                logging.info(f'No reviews in {language=} for {id_restaurant=}')
+                return
+            is_filter_applied = True
 
         # wait until reviews block is loading after apply filter
         # same algorithm for waiting after new page of reviews, also for filters applying
@@ -345,13 +615,14 @@ def get_reviews_info(id_restaurant: str) -> dict:
                 break
 
         # sleep while reviews page loading
-        time.sleep(SLEEP_REVIEWS_PAGE)
+        sleep(SLEEP_REVIEWS_PAGE)
 
         # there is no pagination if it's single review page
         is_only_one_page, page = is_single_page()
 
         # define counter to log how many reviews collected
         count_reviews_before = len(reviews_data)
+        count_seen = 0
         # iterate over every div review on page
         for div_review in driver.find_elements(*DIV_REVIEW_CONTAINER):
 
@@ -360,15 +631,23 @@ def get_reviews_info(id_restaurant: str) -> dict:
                     (page_before and page < page_before):
                 continue
 
+            # skip review written in this or earlier runs without any interaction with it
+            if seen_reviews and div_review.find_element(*DIV_ID_USER).get_attribute('data-reviewid') in seen_reviews:
+                count_seen += 1
+                continue
+
             # get data for one review
             try:
+                start_review = time.perf_counter()
                 id_review, review_data = get_one_review(div_review)
+                if throughput:
+                    throughput.add_step('review', time.perf_counter() - start_review)
                 # append review data to restaurant data
                 reviews_data[id_review] = review_data
                 count_reviews = len(reviews_data)
             except LoadingError:
-                # Getting url for current driver to remember current page of reviews. This is kind of useless here,
-                # because tripadvisor redirecting new profile to first page...
+                # Getting url for current driver to remember current page of reviews. Tripadvisor redirects
+                # new session to first page, so it's useful only if session is restored into new driver
                 url_before = driver.current_url
                 # reload page
                 driver.refresh()
@@ -376,30 +655,40 @@ def get_reviews_info(id_restaurant: str) -> dict:
                 # check if access denied just to log it
                 if 'Access Denied' in driver.page_source:
                     logging.info('Access Denied')
+                    # session with bot checks should not be restored into next drivers
+                    if session_store:
+                        session_store.discard()
+                elif session_store:
+                    # new driver continues this session on the same page of reviews
+                    save_session()
+                    session_store.resume()
 
                 # remember page to skip in after driver reload
                 page_before = page
-                # close driver at all
-                driver.quit()
-                # delete driver object from memory
-                del driver
+                # filter is checked again, it's clicked only if preference cookie was not accepted
+                is_filter_applied = False
                 logging.info(f'Rebooting browser. {url_before=}')
-                time.sleep(SLEEP_DRIVER_REFRESH)
-                # get new driver
-                driver = get_driver()
+                reboot_driver(page_driver)
+                # page is loaded already filtered, without click on filter and reloading reviews
+                set_language_filter_cookie(url_before, language)
                 # directing to previous URL
-                driver.get(url_before)
+                if not get_page(url_before, 'reviews'):
+                    raise LoadingError('Reviews page is not ready after reboot')
                 break
             except Exception:
                 # any other exception shouldn't be handled for now
                 raise
         else:
             logging.info(f'Collected {count_reviews} reviews for {id_restaurant=}.'
-                         f' From {page=} new reviews {count_reviews - count_reviews_before}')
+                         f' From {page=} in {language=} new reviews {count_reviews - count_reviews_before},'
+                         f' already seen {count_seen}',
+                         extra={'id_restaurant': id_restaurant, 'page': page, 'count': count_reviews})
+            if throughput:
+                throughput.add_step('reviews page', time.perf_counter() - start_page)
 
             # return if page is only one OR if reviews count is equal max limit
             if is_only_one_page or MAX_REVIEWS_PER_RESTAURANT == count_reviews:
-                return reviews_data
+                return
 
             # moving to button next page
             ActionChains(driver).move_to_element(
@@ -407,10 +696,12 @@ def get_reviews_info(id_restaurant: str) -> dict:
             ).perform()
             # if A_NEXT_REVIEWS_PAGE has class="disabled" it is last page
             if 'disabled' in driver.find_element(*A_NEXT_REVIEWS_PAGE).get_attribute('class').split():
-                return reviews_data
+                return
             else:
                 # click to load new page
                 driver.find_element(*A_NEXT_REVIEWS_PAGE).click()
+                if recycle_policy:
+                    recycle_policy.count_page()
 
 
 def get_one_review(div_review: WebElement) -> tuple[str, dict]:
@@ -425,65 +716,71 @@ def get_one_review(div_review: WebElement) -> tuple[str, dict]:
     # user id from <div data-reviewid="some_id">
     id_review = div_review.find_element(*DIV_ID_USER).get_attribute('data-reviewid')
 
-    # scroll to reviewer avatar
-    ActionChains(driver).move_to_element(
-        div_review.find_element(*DIV_AVATAR)
-    ).perform()
-
-    # in loop trying to click on reviewer avatar with timeout
-    # algorithm looks similar like in wait_loop_with_timeout()
-    start_timer = time.time()
-    while time.time() - start_timer < TIMEOUT_LOADING:
-        try:
-            # click on reviewer avatar. WebDriverWait takes here div_review
-            # as argument to do relative search of DIV_AVATAR
-            WebDriverWait(div_review, timeout=WAIT_AVATAR).until(
-                ec.element_to_be_clickable(DIV_AVATAR)
-            ).click()
-            break
-        except (ElementClickInterceptedException, TimeoutException):
-            pass
-    else:
-        raise LoadingError('Unable to click on avatar even with timeout')
+    # reviewer popup is opened only if any of its fields requested
+    is_reviewer_info_exists = False
+    if set(FIELDS) & set(REVIEWER_FIELDS):
+        # scroll to reviewer avatar
+        ActionChains(driver).move_to_element(
+            div_review.find_element(*DIV_AVATAR)
+        ).perform()
+
+        # in loop trying to click on reviewer avatar with timeout
+        # algorithm looks similar like in wait_loop_with_timeout()
+        start_timer = time.time()
+        while time.time() - start_timer < TIMEOUT_LOADING:
+            try:
+                # click on reviewer avatar. WebDriverWait takes here div_review
+                # as argument to do relative search of DIV_AVATAR
+                WebDriverWait(div_review, timeout=WAIT_AVATAR).until(
+                    ec.element_to_be_clickable(DIV_AVATAR)
+                ).click()
+                break
+            except (ElementClickInterceptedException, TimeoutException):
+                pass
+        else:
+            raise LoadingError('Unable to click on avatar even with timeout')
 
-    # sleep until user info loading
-    time.sleep(SLEEP_REVIEW_INFO)
+        # sleep until user info loading
+        sleep(SLEEP_REVIEW_INFO)
 
-    # wait until reviewer info loads
-    if not wait_loop_with_timeout(DIV_LOADING_REVIEWER_INFO):
-        raise LoadingError(f'Timeout {TIMEOUT_LOADING} seconds while loading reviewer info.'
-                           f'Probably access denied to website')
+        # wait until reviewer info loads
+        if not wait_loop_with_timeout(DIV_LOADING_REVIEWER_INFO):
+            raise LoadingError(f'Timeout {TIMEOUT_LOADING} seconds while loading reviewer info.'
+                               f'Probably access denied to website')
 
-    # check if reviewer info was loaded on page. Sometimes after click on reviewer avatar nothing happened
-    try:
-        driver.find_element(*SPAN_REVIEWER_INFO)
-        is_reviewer_info_exists = True
-    except NoSuchElementException:
-        is_reviewer_info_exists = False
+        # check if reviewer info was loaded on page. Sometimes after click on reviewer avatar nothing happened
+        try:
+            driver.find_element(*SPAN_REVIEWER_INFO)
+            is_reviewer_info_exists = True
+        except NoSuchElementException:
+            is_reviewer_info_exists = False
 
     if is_reviewer_info_exists:
-        # username from <h3>
+        # username from <h3>. Waiting for it anyway, because it means reviewer info is loaded
         username = WebDriverWait(div_review, timeout=WAIT_USERNAME).until(
             ec.presence_of_element_located(H3_USERNAME)
         ).text
-        review_data['username'] = username
+        if 'username' in FIELDS:
+            review_data['username'] = username
 
         # count of reviews from this user
-        try:
-            count_reviews_user = driver.find_element(*SPAN_COUNT_CONTRIBUTIONS).text
-        # get only numeric value
-            count_reviews_user = count_reviews_user.split()[0]
-            review_data['countsReview'] = count_reviews_user
-        except NoSuchElementException:
-            pass
+        if 'countsReview' in FIELDS:
+            try:
+                count_reviews_user = driver.find_element(*SPAN_COUNT_CONTRIBUTIONS).text
+                # get only numeric value
+                count_reviews_user = count_reviews_user.split()[0]
+                review_data['countsReview'] = count_reviews_user
+            except NoSuchElementException:
+                pass
 
         # count of excellent reviews from this user
-        try:
-            count_excellent_reviews = driver.find_element(*SPAN_EXCELLENT_REVIEWS).text
-            # count_excellent_reviews = count_excellent_reviews.strip()
-            review_data['countExcellent'] = count_excellent_reviews
-        except NoSuchElementException:
-            pass
+        if 'countExcellent' in FIELDS:
+            try:
+                count_excellent_reviews = driver.find_element(*SPAN_EXCELLENT_REVIEWS).text
+                # count_excellent_reviews = count_excellent_reviews.strip()
+                review_data['countExcellent'] = count_excellent_reviews
+            except NoSuchElementException:
+                pass
 
         # close the reviewer info <span> overlay
         WebDriverWait(driver, timeout=WAIT_CLOSE_REVIEWER_INFO).until(
@@ -497,12 +794,14 @@ def get_one_review(div_review: WebElement) -> tuple[str, dict]:
         span_show_more = div_review.find_element(*SPAN_SHOW_MORE)
         return len(span_show_more.text.split())
 
-    # check is button "show more" exists, setting flag
-    try:
-        div_review.find_element(*SPAN_SHOW_MORE)
-        is_button_show_more_exists = True
-    except NoSuchElementException:
-        is_button_show_more_exists = False
+    # check is button "show more" exists, setting flag. Full text is needed only for review text
+    is_button_show_more_exists = False
+    if 'review text' in FIELDS:
+        try:
+            div_review.find_element(*SPAN_SHOW_MORE)
+            is_button_show_more_exists = True
+        except NoSuchElementException:
+            pass
 
     if is_button_show_more_exists and count_words_in_span_show_more() == 1:
         # press button "MORE" to show all text of ALL reviews on this page
@@ -516,22 +815,26 @@ def get_one_review(div_review: WebElement) -> tuple[str, dict]:
                 continue
 
     # text of review
-    text = div_review.find_element(*P_REVIEW_TEXT).text
-    review_data['review text'] = text
+    if 'review text' in FIELDS:
+        text = div_review.find_element(*P_REVIEW_TEXT).text
+        review_data['review text'] = text
 
     # date of visit
-    date_of_visit = div_review.find_element(*DIV_DATE_VISIT).text
-    review_data['date of visit'] = date_of_visit
+    if 'date of visit' in FIELDS:
+        date_of_visit = div_review.find_element(*DIV_DATE_VISIT).text
+        review_data['date of visit'] = date_of_visit
 
     # check if translation exists, setting flag
-    try:
-        # click button "Google Translate"
-        div_review.find_element(*SPAN_TRANSLATE).click()
-        is_translation_exists = True
-        # sleep to wait loading tag is appeared on page
-        time.sleep(SLEEP_WAIT_LOADING_TAG)
-    except NoSuchElementException:
-        is_translation_exists = False
+    is_translation_exists = False
+    if 'translation' in FIELDS:
+        try:
+            # click button "Google Translate"
+            div_review.find_element(*SPAN_TRANSLATE).click()
+            is_translation_exists = True
+            # sleep to wait loading tag is appeared on page
+            sleep(SLEEP_WAIT_LOADING_TAG)
+        except NoSuchElementException:
+            pass
 
     if is_translation_exists:
         # while loading tag is located on page, running through loop
@@ -580,6 +883,72 @@ def is_single_page() -> tuple[bool, int]:
     return is_single, page
 
 
+def reboot_driver(failed_driver: webdriver.Chrome = None, seconds: int = SLEEP_DRIVER_REFRESH) -> None:
+    """ Close failed driver and replace it with new one. Sleep between is to not get "Access Denied" again.
+    New driver is started before it replaces shared driver, so other workers always have some driver
+    """
+
+    # make global driver variable visible in this func
+    global driver
+
+    # current driver by default
+    if failed_driver is None:
+        failed_driver = driver
+    with reboot_lock:
+        # other worker already replaced failed driver while this thread was waiting
+        if driver is not failed_driver:
+            return
+
+        # close driver at all
+        try:
+            failed_driver.quit()
+        except Exception:
+            # driver may be already killed by watchdog
+            pass
+        sleep(seconds)
+        # replace shared driver with new one
+        driver = get_driver()
+
+
+def is_driver_alive(_driver: webdriver.Chrome) -> bool:
+    """ Check if chromedriver process is running and browser responds to command """
+
+    process = _driver.service.process
+    if process is None or process.poll() is not None:
+        return False
+    try:
+        _driver.current_window_handle
+        return True
+    except WebDriverException:
+        return False
+
+
+def save_session() -> None:
+    """ Save session of current driver. Unsaved session is not an error, driver may be already dead """
+
+    # make global driver variable visible in this func
+    global driver
+
+    try:
+        session_store.save(driver)
+    except WebDriverException as ex:
+        logging.warning(f'Unable to save session: {ex.__class__.__name__}')
+
+
+def kill_driver(deadline_name: str) -> bool:
+    """ Kill chromedriver and all chrome processes. Called from watchdog thread when deadline expired,
+    so blocked webdriver command in main thread raises exception. Return False if driver is not alive,
+    e.g. it was quited for reboot
+    """
+
+    process = driver.service.process
+    if process is None or process.poll() is not None:
+        logging.info(f'Watchdog: driver is not alive, nothing to kill for "{deadline_name}"')
+        return False
+    kill_process_tree(process.pid)
+    return True
+
+
 def wait_loop_with_timeout(element_path: tuple[str, str]) -> bool:
     """ Wait with timeout until some loading element is located on page """
 
@@ -587,7 +956,7 @@ def wait_loop_with_timeout(element_path: tuple[str, str]) -> bool:
     global driver
 
     # little sleep before start check
-    time.sleep(SLEEP_WAIT_LOADING_TAG)
+    sleep(SLEEP_WAIT_LOADING_TAG)
     # start timer
     timer_reviewer_info = time.time()
     # loop while timer has not expired or element disappeared
@@ -595,68 +964,237 @@ def wait_loop_with_timeout(element_path: tuple[str, str]) -> bool:
         try:
             driver.find_element(*element_path)
         except NoSuchElementException:
-            time.sleep(SLEEP_WAIT_LOADING_TAG)
+            sleep(SLEEP_WAIT_LOADING_TAG)
             return True
     return False
 
 
+def save_restaurant(url_restaurant: str) -> int:
+    """ Collect restaurant data and append it to output file. Return count of collected reviews """
+
+    # set budget for whole restaurant
+    if watchdog:
+        watchdog.arm('restaurant', WATCHDOG_RESTAURANT_TIMEOUT)
+    try:
+        # collect all restaurants data
+        if profiler:
+            with profiler.restaurant(get_id_restaurant(url_restaurant)):
+                restaurant_data = collect_restaurant_data(url_restaurant)
+        else:
+            restaurant_data = collect_restaurant_data(url_restaurant)
+    finally:
+        if watchdog:
+            watchdog.disarm('restaurant')
+            watchdog.disarm('reviews page')
+            # expired deadline which was not handled must not be picked up by next restaurant
+            watchdog.clear_fired()
+
+    # append collected restaurant data to file
+    with output_lock:
+        if OUTPUT_EXTENSION == '.xlsx':
+            to_excel(restaurant_data)
+        elif OUTPUT_EXTENSION == '.xml':
+            to_xml(restaurant_data)
+
+    # reviews are remembered only after they are written
+    if seen_reviews:
+        seen_reviews.add_many(restaurant_data.get('reviews', {}))
+    return len(restaurant_data.get('reviews', {}))
+
+
+def collect_restaurants(urls_restaurants: list[str], dead_letter: DeadLetterQueue, pass_name: str,
+                        urls_finished: set = None) -> None:
+    """ Save every restaurant. Failed restaurants are moved to dead-letter queue and run continues.
+    Urls of saved or moved to dead-letter queue restaurants are added to urls_finished
+    """
+
+    if throughput:
+        throughput.add_total(len(urls_restaurants))
+
+    for i, url_restaurant in enumerate(urls_restaurants):
+        # extra fields for json logs
+        extra = {'id_restaurant': get_id_restaurant(url_restaurant), 'url': url_restaurant}
+        logging.info(f'{i+1}/{len(urls_restaurants)} START scrapping {url_restaurant=}', extra=extra)
+        start = time.perf_counter()
+        try:
+            count_reviews = save_restaurant(url_restaurant)
+        except Exception as ex:
+            extra['duration'] = round(time.perf_counter() - start, 3)
+            if throughput:
+                throughput.add_restaurant(extra['duration'], 0, is_failed=True)
+            logging.error(f'{i+1}/{len(urls_restaurants)} FAILED {url_restaurant=}. Moved to dead-letter queue',
+                          extra=extra)
+            # driver of failed restaurant, checked after debug artifacts are saved from it
+            failed_driver = driver
+            dead_letter.push(url_restaurant, get_id_restaurant(url_restaurant), ex, failed_driver)
+            dead_letter.count(pass_name, is_failed=True)
+            # crashed or hung browser would fail every next restaurant, so it's replaced now
+            if not is_driver_alive(failed_driver):
+                logging.info('Driver is not alive after failed restaurant. Rebooting browser')
+                reboot_driver(failed_driver, seconds=0)
+        else:
+            dead_letter.remove(url_restaurant)
+            # driver which scrapped restaurant is healthy, its session is worth reusing
+            if session_store:
+                save_session()
+            dead_letter.count(pass_name, is_failed=False)
+            extra['duration'] = round(time.perf_counter() - start, 3)
+            if throughput:
+                throughput.add_restaurant(extra['duration'], count_reviews, is_failed=False)
+            logging.info(f'{i+1}/{len(urls_restaurants)} END scrapping {url_restaurant=}', extra=extra)
+        if urls_finished is not None:
+            urls_finished.add(url_restaurant)
+
+        # between restaurants is safe point to recycle driver. Failed restaurants are checked too,
+        # heavy pages which bloat browser fail more often
+        if recycle_policy and recycle_policy.should_recycle(driver):
+            reboot_driver(seconds=0)
+
+
+def collect_restaurants_in_tabs(urls_restaurants: list[str], dead_letter: DeadLetterQueue, pass_name: str) -> None:
+    """ Split restaurants between workers. Every worker is thread with own tab in shared browser """
+
+    def worker(urls_worker: list[str]) -> None:
+        tab_scheduler.register()
+        # restaurants which are saved or moved to dead-letter queue by this worker
+        urls_finished = set()
+        try:
+            collect_restaurants(urls_worker, dead_letter, pass_name, urls_finished)
+        except Exception as ex:
+            # error of one worker must not lose restaurants of its slice, they are retried in next pass
+            urls_left = [url for url in urls_worker if url not in urls_finished]
+            logging.error(f'{threading.current_thread().name} stopped. {len(urls_left)} restaurants '
+                          f'moved to dead-letter queue\n{ex}', exc_info=True)
+            for url in urls_left:
+                dead_letter.push(url, get_id_restaurant(url), ex)
+        finally:
+            tab_scheduler.unregister()
+
+    threads = [
+        threading.Thread(target=worker, name=f'worker-{i}', args=(urls_restaurants[i::TABS_PER_BROWSER],))
+        for i in range(TABS_PER_BROWSER)
+    ]
+    # first worker loads page in the only tab, so memory of browser with one loaded tab is measured
+    threads[0].start()
+    tab_scheduler.first_page_loaded.wait(WAIT_PAGE_READY)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logging.info(tab_scheduler.report())
+
+
 def collect_data():
     """ Main function for starting collection data """
 
-    # make global driver variable visible in this func
-    global driver
+    # make global variables visible in this func
+    global driver, watchdog, seen_reviews, throughput
 
     # checking input values from constants.py
     check_input_values()
 
+    # review ids from previous runs
+    if IS_SKIP_SEEN_REVIEWS:
+        seen_reviews = SeenReviews(SEEN_REVIEWS_BLOOM_FILEPATH, SEEN_REVIEWS_INDEX_FILEPATH,
+                                   SEEN_REVIEWS_CAPACITY, SEEN_REVIEWS_ERROR_RATE)
+
+    # start thread which kills stuck driver
+    if IS_WATCHDOG:
+        watchdog = Watchdog(kill_driver, WATCHDOG_CHECK_INTERVAL)
+        watchdog.start()
+
+    # live status and report compared with previous runs
+    if IS_THROUGHPUT_REPORT:
+        throughput = ThroughputMonitor(STATUS_FILEPATH, RUNS_HISTORY_FILEPATH, STATUS_INTERVAL, {
+            'URL': URL,
+            'MAX_REVIEWS_PER_RESTAURANT': MAX_REVIEWS_PER_RESTAURANT,
+            'REVIEW_LANGUAGES': REVIEW_LANGUAGES,
+            'FIELD_PROFILE': FIELD_PROFILE,
+            'TABS_PER_BROWSER': TABS_PER_BROWSER,
+            'PAGE_LOAD_STRATEGY': PAGE_LOAD_STRATEGY,
+            'IS_HEADLESS': IS_HEADLESS,
+            'IS_SKIP_SEEN_REVIEWS': IS_SKIP_SEEN_REVIEWS,
+        })
+        throughput.start()
+
+    # failed restaurants from this and previous runs
+    dead_letter = DeadLetterQueue(DEAD_LETTER_FILEPATH, DEAD_LETTER_ARTIFACTS_DIRPATH)
+
     logging.info(f'START scrapping search page {URL=}')
     try:
         # directing URL from constants.py
-        driver.get(URL)
+        is_ready = get_page(URL, 'search')
 
         # check if page exists and 404 not is beginning of title
         if driver.find_element(*TITLE).text.startswith('404'):
             logging.error(f'Page with {URL=} does not exists')
             exit()
+        if not is_ready:
+            raise LoadingError('Search page is not ready')
 
         # collecting restaurants urls
         urls_restaurants = get_urls_restaurants()
         logging.info(f'Total collected {len(urls_restaurants)} restaurant urls')
 
         # iterating over restaurants urls and collecting data
-        for i, url_restaurant in enumerate(urls_restaurants):
-            logging.info(f'{i+1}/{len(urls_restaurants)} START scrapping {url_restaurant=}')
-            # collect all restaurants data
-            restaurant_data = collect_restaurant_data(url_restaurant)
-
-            # append collected restaurant data to file
-            if OUTPUT_EXTENSION == '.xlsx':
-                to_excel(restaurant_data)
-            elif OUTPUT_EXTENSION == '.xml':
-                to_xml(restaurant_data)
+        if tab_scheduler:
+            collect_restaurants_in_tabs(urls_restaurants, dead_letter, 'main pass')
+        else:
+            collect_restaurants(urls_restaurants, dead_letter, 'main pass')
 
-            logging.info(f'{i+1}/{len(urls_restaurants)} END scrapping {url_restaurant=}')
+        # retry failed restaurants with fresh driver
+        for retry_pass in range(1, DEAD_LETTER_RETRY_PASSES+1):
+            if not len(dead_letter):
+                break
+            logging.info(f'Retry pass №:{retry_pass}. {len(dead_letter)} restaurants in dead-letter queue')
+            reboot_driver()
+            if tab_scheduler:
+                collect_restaurants_in_tabs(dead_letter.urls(), dead_letter, f'retry pass {retry_pass}')
+            else:
+                collect_restaurants(dead_letter.urls(), dead_letter, f'retry pass {retry_pass}')
         logging.info(f'END scrapping search page {URL=}\n')
     except Exception as ex:
         # log error with traceback
         logging.error(ex, exc_info=True)
-        try:
-            # take screenshot if it possible just to see what's happened
-            driver.save_screenshot('debug.png')
-            # save html page if it possible just to see what's happened
-            with open('debug.html', 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
-        except:
-            pass
+        # take screenshot and save html page if it possible just to see what's happened
+        save_debug_artifacts(driver, Path('debug'))
+    finally:
+        logging.info(dead_letter.report())
+        if watchdog:
+            watchdog.stop()
+            logging.info(watchdog.report())
+        if throughput:
+            throughput.stop()
+            logging.info(throughput.report(RUNS_HISTORY_COMPARE, THROUGHPUT_DROP_RATIO))
+        if seen_reviews:
+            logging.info(f'Seen reviews: {seen_reviews.count()} in index')
+            seen_reviews.close()
+        if recycle_policy:
+            logging.info(f'Driver was recycled {recycle_policy.count_recycles} times. '
+                         f'Memory log saved to "{MEMORY_LOG_FILEPATH}"')
+        # write report even if scrapping was stopped by error
+        if profiler:
+            profiler.write_report(PROFILING_REPORT_FILEPATH)
+
+
+def run() -> None:
+    """ Get driver, collect data and close browser """
+
+    # make global driver variable visible in this func
+    global driver
+
+    # getting driver
+    driver = get_driver()
+    try:
+        # run main function
+        collect_data()
+    finally:
+        # close browser
+        driver.quit()
 
 
 # Check if file is running "directly"
 if __name__ == '__main__':
     # get own logger
-    get_logger('scrapper.log')
-    # getting driver
-    driver = get_driver()
-    # run main function
-    collect_data()
-    # close browser
-    driver.quit()
+    get_logger(LOG_FILEPATH, LOG_JSON, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
+    run()
@@ -0,0 +1,404 @@
+# to run server from command line with settings
+import argparse
+# escape generated texts
+import html
+# stats endpoint
+import json
+# logs instead of prints
+import logging
+# generated data, latency and errors injection
+import random
+# regular expressions for routes
+import re
+# latency
+import time
+# request counters are shared between threads
+import threading
+# http server from standard library, so mock has no dependencies
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+# language filter is persisted in cookie
+from http.cookies import SimpleCookie
+
+# logging customization
+from my_logging import get_logger
+
+# routes of pages which are directed by scrapper
+ROUTE_SEARCH = re.compile(r'^/Restaurants-g(?P<geo>\d+)(?:-oa(?P<offset>\d+))?-(?P<name>[^/]+)\.html$')
+ROUTE_RESTAURANT = re.compile(
+    r'^/Restaurant_Review-g(?P<geo>\d+)-d(?P<id>\d+)-Reviews(?:-or(?P<offset>\d+))?-(?P<name>[^/]+)\.html$'
+)
+# cookie which defines session of browser
+SESSION_COOKIE = 'TASession'
+# cookie which keeps selected language filter, like data-param of filter
+FILTER_COOKIE = 'filterLang'
+# first id of generated restaurants
+FIRST_ID_RESTAURANT = 100000
+
+WORDS = ('tasty', 'borscht', 'service', 'cozy', 'waiter', 'dessert', 'expensive', 'view', 'music', 'coffee',
+         'delicious', 'slow', 'friendly', 'pelmeni', 'wine', 'atmosphere', 'again', 'recommend', 'portion', 'bill')
+LANGUAGES = ('en', 'ru', 'de', 'fr', 'it', 'es')
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+.ui_overlay {{ display: block; position: fixed; bottom: 10px; right: 10px; width: 300px; min-height: 60px;
+              background: #fff; border: 1px solid #000; z-index: 10; }}
+.ui_close_x {{ display: inline-block; width: 20px; height: 20px; cursor: pointer; }}
+.ui_avatar {{ display: inline-block; width: 40px; height: 40px; background: #ccc; cursor: pointer; }}
+.taLnk, .checkmark, .mMkhr, .nav, span[data-url] {{ cursor: pointer; color: #00f; }}
+.checkmark {{ display: inline-block; min-width: 10px; min-height: 10px; }}
+</style>
+</head>
+<body>
+{body}
+<script>
+{script}
+</script>
+</body>
+</html>
+'''
+
+SCRIPT = '''
+function sleep(ms) { return new Promise(resolve => setTimeout(resolve, ms)); }
+
+function showLoading(isLoading) {
+    document.getElementById('taplc_loading').style.display = isLoading ? 'block' : 'none';
+}
+
+// replace reviews list and pagination like tripadvisor does it without reloading page
+async function loadReviews(page) {
+    showLoading(true);
+    const response = await fetch(`/mock/reviews?restaurant=${ID_RESTAURANT}&page=${page}`);
+    // loading box stays on page if request failed, like on real site
+    if (!response.ok) { return; }
+    document.getElementById('reviews').innerHTML = await response.text();
+    history.pushState(null, '', REVIEWS_URL.replace('-Reviews-', page > 1 ? `-Reviews-or${(page - 1) * REVIEWS_PER_PAGE}-` : '-Reviews-'));
+    showLoading(false);
+}
+
+// selected language is persisted in cookie, reviews are loaded for it
+function changeFilter(language) {
+    document.querySelectorAll('div[data-param="filterLang"] input').forEach(input => {
+        input.checked = input.value === language;
+    });
+    document.cookie = `filterLang=${language}; path=/`;
+    loadReviews(1);
+}
+
+async function openOverlay(className, url) {
+    document.querySelectorAll('.ui_overlay').forEach(overlay => overlay.remove());
+    const overlay = document.createElement('span');
+    overlay.className = `ui_overlay ${className}`;
+    overlay.innerHTML = '<div class="cssLoadingSpinner">Loading...</div>';
+    document.body.appendChild(overlay);
+    const response = await fetch(url);
+    // spinner stays on page if request failed, like on real site
+    if (!response.ok) { return; }
+    overlay.innerHTML = await response.text();
+}
+
+async function expandAll() {
+    await sleep(EXPAND_DELAY);
+    document.querySelectorAll('p[data-full]').forEach(p => { p.textContent = p.dataset.full; });
+    document.querySelectorAll('span.taLnk.ulBlueLinks').forEach(span => { span.textContent = 'Show less'; });
+}
+
+function toggleSchedule() {
+    const schedule = document.getElementById('schedule');
+    schedule.style.display = schedule.style.display === 'none' ? 'block' : 'none';
+}
+
+document.addEventListener('click', event => {
+    const target = event.target;
+    if (target.classList.contains('ui_close_x')) {
+        target.parentElement.remove();
+    } else if (target.classList.contains('ui_avatar')) {
+        openOverlay('ui_popover', `/mock/reviewer?id=${target.dataset.uid}`);
+    } else if (target.dataset.url) {
+        openOverlay('ui_modal', target.dataset.url);
+    } else if (target.classList.contains('ulBlueLinks')) {
+        expandAll();
+    } else if (target.classList.contains('checkmark')) {
+        changeFilter(target.closest('[data-value]').dataset.value);
+    } else if (target.classList.contains('mMkhr')) {
+        toggleSchedule();
+    } else if (target.classList.contains('next') && !target.classList.contains('disabled')) {
+        loadReviews(Number(document.getElementById('current_page').value) + 1);
+    }
+});
+'''
+
+
+class MockTripAdvisor(ThreadingHTTPServer):
+    """ Server which generates search, restaurant and reviews pages with markup for locators from constants.py """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], args: argparse.Namespace):
+        super().__init__(address, Handler)
+        self.args = args
+        # route -> count of responses by status
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+    def count(self, route: str, status: int) -> None:
+        with self.stats_lock:
+            statuses = self.stats.setdefault(route, {})
+            statuses[status] = statuses.get(status, 0) + 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: MockTripAdvisor
+
+    def log_message(self, format, *args):
+        if self.server.args.verbose:
+            logging.info(f'{self.address_string()} {format % args}')
+
+    def do_GET(self):
+        args = self.server.args
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        is_ajax = url.path.startswith('/mock/')
+
+        # latency for every request, ajax requests are usually faster
+        latency = args.ajax_latency if is_ajax else args.latency
+        time.sleep(max(latency + random.uniform(-args.jitter, args.jitter), 0))
+
+        if url.path == '/mock/stats':
+            return self.send('stats', 200, json.dumps(self.server.stats), 'application/json')
+
+        # injected failures
+        if random.random() < args.access_denied_rate:
+            return self.send('access denied', 403, PAGE.format(
+                title='Access Denied', body='<h1>Access Denied</h1><p>You don\'t have permission to access</p>',
+                script=''
+            ))
+        if random.random() < args.error_rate:
+            return self.send('error', 500, PAGE.format(title='500 Internal Server Error', body='', script=''))
+
+        if match := ROUTE_SEARCH.match(url.path):
+            return self.send('search', 200, self.search_page(match))
+        if match := ROUTE_RESTAURANT.match(url.path):
+            if 0 <= int(match['id']) - FIRST_ID_RESTAURANT < args.search_pages * args.restaurants_per_page:
+                return self.send('restaurant', 200, self.restaurant_page(match))
+        if url.path == '/mock/reviews':
+            return self.send('reviews', 200, reviews_fragment(args, int(query['restaurant']), int(query['page']),
+                                                              self.get_cookie(FILTER_COOKIE) or 'ALL'))
+        if url.path == '/mock/reviewer':
+            return self.send('reviewer', 200, reviewer_fragment(int(query['id'])))
+        if url.path == '/mock/translation':
+            return self.send('translation', 200, translation_fragment(int(query['id'])))
+
+        self.send('not found', 404, PAGE.format(title='404 Not Found', body='<h1>404 Not Found</h1>', script=''))
+
+    def send(self, route: str, status: int, body: str, content_type: str = 'text/html; charset=utf-8') -> None:
+        self.server.count(route, status)
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        # every new browser gets new session
+        if SESSION_COOKIE not in (self.headers.get('Cookie') or ''):
+            self.send_header('Set-Cookie', f'{SESSION_COOKIE}={random.getrandbits(64):x}; Path=/')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def get_cookie(self, name: str) -> str | None:
+        cookie = SimpleCookie(self.headers.get('Cookie') or '')
+        return cookie[name].value if name in cookie else None
+
+    def search_page(self, match: re.Match) -> str:
+        """ Search page with restaurants links and pagination """
+
+        args = self.server.args
+        page = int(match['offset'] or 0) // args.restaurants_per_page + 1
+        geo, name = match['geo'], match['name']
+
+        body = []
+        for i in range(args.restaurants_per_page):
+            id_restaurant = FIRST_ID_RESTAURANT + (page - 1) * args.restaurants_per_page + i
+            href = f'/Restaurant_Review-g{geo}-d{id_restaurant}-Reviews-{restaurant_name(id_restaurant)}-{name}.html'
+            body.append(f'<div><a class="Lwqic Cj b" href="{href}">{i + 1}. {restaurant_name(id_restaurant)}</a></div>')
+
+        # there is no pagination at all if page is single
+        if args.search_pages > 1:
+            body.append(f'<div class="pageNumbers"><span class="pageNum current" data-page-number="{page}">'
+                        f'{page}</span></div>')
+            if page < args.search_pages:
+                href = f'/Restaurants-g{geo}-oa{page * args.restaurants_per_page}-{name}.html'
+                body.append(f'<a class="nav next rndBtn ui_button primary taLnk" href="{href}">Next</a>')
+            else:
+                body.append('<span class="nav next disabled">Next</span>')
+
+        return PAGE.format(title=f'Restaurants in {name}', body='\n'.join(body), script='')
+
+    def restaurant_page(self, match: re.Match) -> str:
+        """ Restaurant page with info, schedule popup, language filter and first page of reviews """
+
+        args = self.server.args
+        id_restaurant = int(match['id'])
+        rng = random.Random(id_restaurant)
+        name = restaurant_name(id_restaurant)
+        page = int(match['offset'] or 0) // args.reviews_per_page + 1
+        # tripadvisor opens first page of reviews for new sessions
+        if SESSION_COOKIE not in (self.headers.get('Cookie') or ''):
+            page = 1
+
+        schedule = ''.join(
+            f'<div class="RiEuX"><div>{weekday}</div><div>{rng.randint(8, 12)}:00 - {rng.randint(20, 23)}:00</div></div>'
+            for weekday in ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+        )
+        # language filter is not selected for new session, then reviews in all languages are shown
+        language = self.get_cookie(FILTER_COOKIE)
+        filter_options = ''.join(
+            f'<div data-value="{value}"><label><input type="radio" value="{value}"'
+            f'{" checked" if value == language else ""}><span class="checkmark"></span>{title}</label></div>'
+            for value, title in (('ALL', 'All languages'), *((value, value) for value in LANGUAGES))
+        )
+        count_pages = count_reviews_pages(args, id_restaurant)
+
+        body = f'''
+<h1 data-test-target="top-info-header">{html.escape(name)}</h1>
+<a class="AYHFM"><span><b>#{id_restaurant - FIRST_ID_RESTAURANT + 1}</b> of {args.search_pages * args.restaurants_per_page}</span></a>
+<span class="DsyBj cNFrA AsyOO"><span>Menu</span><a href="https://example.com/menu/{id_restaurant}">Menu</a></span>
+<span class="mMkhr">See all hours</span>
+<div id="schedule" style="display:none">{schedule}</div>
+<svg aria-label="{rng.choice(('3.5', '4.0', '4.5', '5.0'))} of 5 bubbles" width="80" height="16"></svg>
+<div data-param="filterLang">{filter_options}</div>
+<div id="taplc_loading" style="display: none;"><div class="loadingBox">Loading...</div></div>
+<div id="reviews">{reviews_fragment(args, id_restaurant, page, language or 'ALL') if count_pages else ''}</div>
+'''
+        reviews_url = f'/Restaurant_Review-g{match["geo"]}-d{id_restaurant}-Reviews-{match["name"]}.html'
+        script = f'''
+const ID_RESTAURANT = {id_restaurant};
+const REVIEWS_URL = "{reviews_url}";
+const REVIEWS_PER_PAGE = {args.reviews_per_page};
+const EXPAND_DELAY = {int(args.ajax_latency * 1000)};
+''' + SCRIPT
+        return PAGE.format(title=f'{html.escape(name)} - Menu, Prices & Restaurant Reviews', body=body, script=script)
+
+
+def restaurant_name(id_restaurant: int) -> str:
+    """ Generated name without spaces, so it can be part of url """
+    rng = random.Random(id_restaurant)
+    return f'{rng.choice(WORDS).capitalize()}_{rng.choice(WORDS).capitalize()}_{id_restaurant}'
+
+
+def count_reviews_pages(args: argparse.Namespace, id_restaurant: int) -> int:
+    """ Some restaurants have no reviews at all, others have up to max pages """
+    return random.Random(id_restaurant).randint(0, args.review_pages)
+
+
+def review_language(id_review: int) -> str:
+    return random.Random(id_review).choice(LANGUAGES)
+
+
+def reviews_fragment(args: argparse.Namespace, id_restaurant: int, page: int, language: str = 'ALL') -> str:
+    """ List of reviews in language with pagination. Used in restaurant page and for loading next pages """
+
+    # ids of all reviews of restaurant, filtered by language
+    ids_reviews = [
+        id_restaurant * 1000 + i for i in range(count_reviews_pages(args, id_restaurant) * args.reviews_per_page)
+    ]
+    if language != 'ALL':
+        ids_reviews = [id_review for id_review in ids_reviews if review_language(id_review) == language]
+    count_pages = -(-len(ids_reviews) // args.reviews_per_page)
+    page = min(max(page, 1), max(count_pages, 1))
+
+    reviews = []
+    for id_review in ids_reviews[(page - 1) * args.reviews_per_page:page * args.reviews_per_page]:
+        rng = random.Random(id_review)
+        # language is the first random choice of review
+        rng.choice(LANGUAGES)
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 80)))
+        # long texts are truncated and have button "More"
+        is_long = len(text) > 200
+        text_tag = f'<p data-full="{html.escape(text)}">{html.escape(text[:200])}...</p>' if is_long \
+            else f'<p>{html.escape(text)}</p>'
+        button_more = '<span class="taLnk ulBlueLinks">More</span>' if is_long else ''
+        # reviews not in language of site have button for translation
+        language_review = review_language(id_review)
+        button_translate = f'<div><span data-url="/mock/translation?id={id_review}">Google Translation</span></div>' \
+            if language_review != 'ru' else ''
+
+        reviews.append(f'''
+<div class="review-container">
+    <div>
+        <div id="review_{id_review}" data-reviewid="{id_review}" lang="{language_review}">
+            <div class="ui_avatar" data-uid="{rng.randint(1, 10 ** 6)}"></div>
+            <div>
+                <div>
+                    <div class="prw_rup prw_reviews_stay_date_hsx">Date of visit: {rng.randint(1, 28)}.{rng.randint(1, 12)}.{rng.randint(2015, 2022)}</div>
+                    {text_tag}
+                    {button_more}
+                    {button_translate}
+                </div>
+            </div>
+        </div>
+    </div>
+</div>''')
+
+    # there is no pagination at all if page is single
+    pagination = ''
+    if count_pages > 1:
+        is_last = ' disabled' if page == count_pages else ''
+        pagination = f'''
+<div class="pageNumbers"><a class="pageNum current" data-page-number="{page}">{page}</a></div>
+<a class="nav next ui_button primary{is_last}">Next</a>'''
+
+    return '\n'.join(reviews) + pagination + f'<input type="hidden" id="current_page" value="{page}">'
+
+
+def reviewer_fragment(uid: int) -> str:
+    """ Content of reviewer popover """
+    rng = random.Random(uid)
+    return f'''<h3>user_{uid}</h3>
+<span class="badgeTextReviewEnhancements">{rng.randint(1, 500)} contributions</span>
+<span class="rowCountReviewEnhancements rowCellReviewEnhancements">{rng.randint(0, 100)}</span>
+<div class="ui_close_x">×</div>'''
+
+
+def translation_fragment(id_review: int) -> str:
+    """ Content of translation modal """
+    rng = random.Random(id_review)
+    text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 40)))
+    return f'<div class="entry">[translated] {html.escape(text)}</div><div class="ui_close_x">×</div>'
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Local mock of TripAdvisor for end-to-end load testing. '
+                    'Set URL in constants.py to http://127.0.0.1:8000/Restaurants-g298484-Moscow_Central_Russia.html'
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--search-pages', type=int, default=3, help='count of search pages')
+    parser.add_argument('--restaurants-per-page', type=int, default=30)
+    parser.add_argument('--review-pages', type=int, default=5, help='max count of reviews pages per restaurant')
+    parser.add_argument('--reviews-per-page', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.3, help='latency of pages, seconds')
+    parser.add_argument('--ajax-latency', type=float, default=0.1,
+                        help='latency of reviews pages, popovers and translations, seconds')
+    parser.add_argument('--jitter', type=float, default=0.05, help='random addition to latency, seconds')
+    parser.add_argument('--access-denied-rate', type=float, default=0, help='probability of "Access Denied"')
+    parser.add_argument('--error-rate', type=float, default=0, help='probability of 500 response')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    get_logger('mock_server.log')
+    args = parse_args()
+    server = MockTripAdvisor((args.host, args.port), args)
+    logging.info(f'Mock TripAdvisor is running on http://{args.host}:{args.port}. Stats on /mock/stats')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logging.info(f'Responses: {json.dumps(server.stats)}')
+        server.server_close()
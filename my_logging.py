@@ -1,20 +1,83 @@
 # for getting custom logger
 import logging
+# handlers which move log I/O to background thread, rotation of log file
+import logging.handlers
+# structured logs
+import json
+# queue between scrapping threads and logging thread
+import queue
+# stop listener and flush logs on exit
+import atexit
 # redirect stdout
 import sys
 
+# attributes which can be passed to log record with extra={...} and are written to json logs
+JSON_EXTRA_FIELDS = ('id_restaurant', 'page', 'url', 'duration', 'count')
 
-def get_logger(filename):
+
+class JsonFormatter(logging.Formatter):
+    """ One json object per line with time, level, worker (thread name), message and extra fields """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'worker': record.threadName,
+            'message': record.getMessage(),
+        }
+        for field in JSON_EXTRA_FIELDS:
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        # traceback is already formatted by QueueHandler
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """ Prepare record in scrapping thread: merge args into message and format traceback,
+    so record can be safely written in background thread
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # copy record, because other handlers may use original one. Args may be changed before record is written
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        # traceback is formatted in this thread, because exception objects may change later
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def get_logger(filename, is_json: bool = False, max_bytes: int = 0, backup_count: int = 0):
     """ Define logger to write logs in specific file.
-    mode='a' is appending if file already exists
+    Records are put into queue and written to file and stdout in background thread,
+    so logging doesn't block scrapping threads on disk and stdout.
+    File is rotated when it reaches max_bytes (0 is no rotation), mode='a' is appending if file already exists
     """
+
+    if is_json:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('[{asctime}]:[{levelname}]:{message}', style='{')
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename, mode='a', maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler(sys.stdout)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+
     logging.basicConfig(
         level=logging.INFO,
-        encoding='utf-8',
-        format="[{asctime}]:[{levelname}]:{message}",
-        style='{',
-        handlers=[
-            logging.FileHandler(filename, mode='a'),
-            logging.StreamHandler(sys.stdout),
-        ]
+        handlers=[QueueHandler(log_queue)]
     )
+    listener.start()
+    # write all records left in queue before exit
+    atexit.register(listener.stop)
+    return listener
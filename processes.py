@@ -0,0 +1,74 @@
+# to send signals to processes
+import os
+import signal
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# processes information on Linux
+PROC_PATH = Path('/proc')
+
+
+def get_children(pid: int) -> list[int]:
+    """ Get pids of direct children of process. Reads /proc, so works only on Linux """
+
+    children = []
+    for stat_path in PROC_PATH.glob('[0-9]*/stat'):
+        try:
+            stat = stat_path.read_text()
+        except OSError:
+            # process finished while iterating
+            continue
+        # process name in brackets may contain spaces, so fields are splitting after last ")"
+        fields = stat[stat.rfind(')') + 2:].split()
+        # 4th field in stat is ppid, here it's second after state
+        if int(fields[1]) == pid:
+            children.append(int(stat_path.parent.name))
+    return children
+
+
+def get_process_tree(pid: int) -> list[int]:
+    """ Get pids of process and all its descendants """
+
+    tree = [pid]
+    for child in get_children(pid):
+        tree.extend(get_process_tree(child))
+    return tree
+
+
+def kill_process_tree(pid: int) -> None:
+    """ Kill process with all descendants. Children are collected first, because they are
+    reparenting after parent killed
+    """
+
+    for _pid in reversed(get_process_tree(pid)):
+        try:
+            os.kill(_pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def get_memory(pid: int) -> int:
+    """ Get memory of process in bytes. Pss (shared pages divided between processes) is used if it's
+    available, because chrome processes share a lot of memory, otherwise Rss
+    """
+
+    try:
+        for line in (PROC_PATH / str(pid) / 'smaps_rollup').read_text().splitlines():
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        for line in (PROC_PATH / str(pid) / 'status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # process finished or it's kernel thread
+    return 0
+
+
+def get_tree_memory(pid: int) -> int:
+    """ Get memory of process and all its descendants in bytes """
+    return sum(get_memory(_pid) for _pid in get_process_tree(pid))
@@ -0,0 +1,120 @@
+# for timing of every webdriver command
+import time
+# logs instead of prints
+import logging
+# optional python-level profile per restaurant
+import cProfile
+# to wrap driver command executor
+import functools
+# restaurant is accounted per thread, because workers may share one driver
+import threading
+# contextmanager for per-restaurant profiling
+from contextlib import contextmanager
+# to create filepath which not OS dependency
+from pathlib import Path
+
+
+class CommandProfiler:
+    """ Count and time every command which driver sends to chromedriver.
+    Commands are grouped by type ('findElement', 'clickElement', ...) and by locator, if command has it
+    """
+
+    def __init__(self, is_cprofile: bool = False, cprofile_dirpath: Path = None):
+        # (command, locator) -> [count, total seconds, max seconds]
+        self.commands = {}
+        # restaurant id -> [count commands, total seconds in commands, wall seconds]
+        self.restaurants = {}
+        # thread ident -> restaurant which is scrapping now in this thread, commands are accounted to it
+        self.current_restaurants = {}
+        # save cProfile stats for every restaurant if True
+        self.is_cprofile = is_cprofile
+        self.cprofile_dirpath = cprofile_dirpath
+
+    def attach(self, driver) -> None:
+        """ Wrap execute() of driver command executor. Must be called for every new driver """
+
+        executor = driver.command_executor
+        # don't wrap twice the same executor
+        if getattr(executor.execute, 'is_profiled', False):
+            return
+
+        original_execute = executor.execute
+
+        @functools.wraps(original_execute)
+        def execute(command, params):
+            start = time.perf_counter()
+            try:
+                return original_execute(command, params)
+            finally:
+                self.add(command, params, time.perf_counter() - start)
+
+        execute.is_profiled = True
+        executor.execute = execute
+
+    def add(self, command: str, params: dict, duration: float) -> None:
+        """ Account one command """
+
+        # locator exists only for find commands, e.g. {'using': 'xpath', 'value': '//h1'}
+        locator = None
+        if params and 'using' in params:
+            locator = f'{params["using"]}={params.get("value")}'
+
+        stats = self.commands.setdefault((command, locator), [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+
+        current_restaurant = self.current_restaurants.get(threading.get_ident())
+        if current_restaurant is not None:
+            self.restaurants[current_restaurant][0] += 1
+            self.restaurants[current_restaurant][1] += duration
+
+    @contextmanager
+    def restaurant(self, id_restaurant: str):
+        """ Account all commands inside this block to restaurant. Also run cProfile if it's enabled """
+
+        self.current_restaurants[threading.get_ident()] = id_restaurant
+        self.restaurants.setdefault(id_restaurant, [0, 0.0, 0.0])
+        profile = cProfile.Profile() if self.is_cprofile else None
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                self.cprofile_dirpath.mkdir(parents=True, exist_ok=True)
+                profile.dump_stats(self.cprofile_dirpath / f'{id_restaurant}.prof')
+            self.restaurants[id_restaurant][2] += time.perf_counter() - start
+            self.current_restaurants.pop(threading.get_ident(), None)
+
+    def report(self, top: int = 30) -> str:
+        """ Ranked report of hot selectors and round-trips per restaurant """
+
+        lines = ['Hot commands by total time:',
+                 f'{"total, s":>10} {"count":>7} {"avg, ms":>9} {"max, ms":>9}  command  locator']
+        # sort by total time spent in command
+        ranked = sorted(self.commands.items(), key=lambda item: item[1][1], reverse=True)
+        for (command, locator), (count, total, maximum) in ranked[:top]:
+            lines.append(f'{total:>10.2f} {count:>7} {total / count * 1000:>9.1f} {maximum * 1000:>9.1f}'
+                         f'  {command}  {locator or ""}')
+
+        lines.append('')
+        lines.append('Round-trips per restaurant:')
+        lines.append(f'{"commands":>9} {"in driver, s":>13} {"wall, s":>9}  restaurant id')
+        for id_restaurant, (count, total, wall) in self.restaurants.items():
+            lines.append(f'{count:>9} {total:>13.2f} {wall:>9.2f}  {id_restaurant}')
+
+        total_commands = sum(stats[0] for stats in self.commands.values())
+        total_seconds = sum(stats[1] for stats in self.commands.values())
+        lines.append('')
+        lines.append(f'Total {total_commands} commands, {total_seconds:.2f} seconds in driver')
+        return '\n'.join(lines)
+
+    def write_report(self, filepath: Path) -> None:
+        """ Write report to file and log it """
+
+        report = self.report()
+        filepath.write_text(report, encoding='utf-8')
+        logging.info(f'Profiling report saved to "{filepath}"\n{report}')
@@ -0,0 +1,55 @@
+# logs instead of prints
+import logging
+# time for memory log
+import time
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# memory of chrome processes
+from processes import get_tree_memory
+
+
+class RecyclePolicy:
+    """ Decide when driver should be recycled proactively. Watches memory of chromedriver with all chrome
+    processes and count of loaded pages since driver started. Memory over time is written to csv file
+    """
+
+    def __init__(self, max_memory_mb: int, max_pages: int, log_filepath: Path):
+        self.max_memory_mb = max_memory_mb
+        self.max_pages = max_pages
+        self.log_filepath = log_filepath
+        # pages loaded by current driver
+        self.pages = 0
+        # count of recycles for this run
+        self.count_recycles = 0
+
+    def count_page(self) -> None:
+        """ Count loaded page: directing url or clicking to next page """
+        self.pages += 1
+
+    def reset(self) -> None:
+        """ New driver started """
+        self.pages = 0
+
+    def should_recycle(self, driver) -> bool:
+        """ Check thresholds and log memory. Must be called only in safe point, e.g. between restaurants """
+
+        memory_mb = get_tree_memory(driver.service.process.pid) / 1024 / 1024
+        reason = None
+        if self.max_memory_mb and memory_mb > self.max_memory_mb:
+            reason = f'memory {memory_mb:.0f} MB > {self.max_memory_mb} MB'
+        elif self.max_pages and self.pages > self.max_pages:
+            reason = f'pages {self.pages} > {self.max_pages}'
+
+        # write header for new file
+        if not self.log_filepath.exists():
+            self.log_filepath.write_text('time,pages,memory_mb,is_recycle\n', encoding='utf-8')
+        with open(self.log_filepath, 'a', encoding='utf-8') as f:
+            f.write(f'{time.strftime("%Y-%m-%d %H:%M:%S")},{self.pages},{memory_mb:.1f},{int(bool(reason))}\n')
+
+        if reason:
+            self.count_recycles += 1
+            logging.info(f'Recycling driver: {reason}')
+            return True
+        logging.info(f'Driver memory {memory_mb:.0f} MB after {self.pages} pages')
+        return False
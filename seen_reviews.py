@@ -0,0 +1,111 @@
+# logs instead of prints
+import logging
+# bit array of bloom filter is memory-mapped file, only touched pages are in memory
+import mmap
+# size of bloom filter
+import math
+# stable hash of review id between runs
+import hashlib
+# header of bloom filter file
+import struct
+# exact on-disk index of seen reviews
+import sqlite3
+# workers may share this set, when they are tabs of one browser
+import threading
+# type hints
+from typing import Iterable
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# magic, count of bits, count of hashes
+HEADER = struct.Struct('<8sQQ')
+MAGIC = b'RVBLOOM1'
+
+
+class SeenReviews:
+    """ Persistent set of review ids which were already written in this or earlier runs.
+    Bloom filter in memory-mapped file answers "surely not seen" without disk lookup.
+    "Maybe seen" is confirmed by exact index in sqlite, so false positives never skip a new review
+    """
+
+    def __init__(self, bloom_filepath: Path, index_filepath: Path, capacity: int, error_rate: float):
+        self.lock = threading.Lock()
+        self.index = sqlite3.connect(index_filepath, check_same_thread=False)
+        self.index.execute('CREATE TABLE IF NOT EXISTS reviews (id TEXT PRIMARY KEY) WITHOUT ROWID')
+        self.index.commit()
+
+        # optimal count of bits and hashes for capacity and error rate
+        count_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        count_hashes = max(1, round(count_bits / capacity * math.log(2)))
+
+        is_new = not bloom_filepath.exists()
+        if is_new:
+            with open(bloom_filepath, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, count_bits, count_hashes))
+                f.truncate(HEADER.size + math.ceil(count_bits / 8))
+
+        self.file = open(bloom_filepath, 'r+b')
+        self.bits = mmap.mmap(self.file.fileno(), 0)
+        magic, self.count_bits, self.count_hashes = HEADER.unpack_from(self.bits)
+        if magic != MAGIC:
+            raise ValueError(f'"{bloom_filepath}" is not a bloom filter of reviews')
+        if (self.count_bits, self.count_hashes) != (count_bits, count_hashes):
+            # filter keeps parameters it was created with, otherwise old bits are meaningless
+            logging.info(f'Bloom filter "{bloom_filepath}" was created with other capacity or error rate, '
+                         f'using its {self.count_bits} bits and {self.count_hashes} hashes')
+
+        # filter is rebuilt from exact index, if filter file was deleted
+        if is_new:
+            for (id_review, ) in self.index.execute('SELECT id FROM reviews'):
+                self.set_bits(id_review)
+
+        logging.info(f'Seen reviews: {self.count()} in index, '
+                     f'bloom filter {len(self.bits) / 1024 / 1024:.1f} MB in "{bloom_filepath}"')
+
+    def positions(self, id_review: str) -> Iterable[int]:
+        """ Bit positions of review id. Double hashing from two halves of one blake2b digest """
+
+        digest = hashlib.blake2b(id_review.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.count_hashes):
+            yield (h1 + i * h2) % self.count_bits
+
+    def set_bits(self, id_review: str) -> None:
+        for position in self.positions(id_review):
+            offset = HEADER.size + position // 8
+            self.bits[offset] |= 1 << (position % 8)
+
+    def maybe_contains(self, id_review: str) -> bool:
+        for position in self.positions(id_review):
+            if not self.bits[HEADER.size + position // 8] & (1 << (position % 8)):
+                return False
+        return True
+
+    def __contains__(self, id_review: str) -> bool:
+        with self.lock:
+            if not self.maybe_contains(id_review):
+                return False
+            # confirm by exact index
+            return self.index.execute('SELECT 1 FROM reviews WHERE id = ?', (id_review, )).fetchone() is not None
+
+    def add_many(self, ids_reviews: Iterable[str]) -> None:
+        """ Remember reviews. Must be called only after reviews are written to output """
+
+        with self.lock:
+            ids_reviews = list(ids_reviews)
+            self.index.executemany('INSERT OR IGNORE INTO reviews (id) VALUES (?)',
+                                   ((id_review, ) for id_review in ids_reviews))
+            self.index.commit()
+            for id_review in ids_reviews:
+                self.set_bits(id_review)
+
+    def count(self) -> int:
+        return self.index.execute('SELECT COUNT(*) FROM reviews').fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.bits.flush()
+            self.bits.close()
+            self.file.close()
+            self.index.close()
@@ -0,0 +1,93 @@
+# logs instead of prints
+import logging
+# time when session was saved
+import time
+# sessions are saved as json files
+import json
+# workers with tabs share one driver and one profile
+import threading
+# to create filepath which not OS dependency
+from pathlib import Path
+
+
+class SessionStore:
+    """ Pool of browser profiles: cookies and local storage of healthy drivers saved to json files.
+    Every new driver rotates to next profile of pool and restores it before first page, so site sees
+    known sessions spread over pool instead of new one. Only driver which is rebooted to resume
+    page of reviews keeps profile of previous driver, see resume(). Profile which got "Access Denied" is discarded
+    """
+
+    def __init__(self, dirpath: Path, pool_size: int, js_get_local_storage: str, js_set_local_storage: str):
+        self.dirpath = dirpath
+        self.pool_size = pool_size
+        self.js_get_local_storage = js_get_local_storage
+        self.js_set_local_storage = js_set_local_storage
+        # profile of current driver, -1 before first driver
+        self.profile = -1
+        # next driver keeps profile of current driver instead of rotation
+        self.is_resume = False
+        self.count_restored = 0
+        self.lock = threading.Lock()
+
+    def filepath(self, profile: int) -> Path:
+        return self.dirpath / f'profile-{profile}.json'
+
+    def restore(self, driver) -> None:
+        """ Restore profile into new driver. Must be called before first page is loaded.
+        Cookies are set with devtools protocol, because selenium can add cookies only for opened domain.
+        Local storage is set by script which runs before scripts of every page of saved origin
+        """
+
+        with self.lock:
+            if self.is_resume:
+                self.is_resume = False
+            else:
+                self.profile = (self.profile + 1) % self.pool_size
+            filepath = self.filepath(self.profile)
+            if not filepath.exists():
+                logging.info(f'Session profile {self.profile} is empty, starting new session')
+                return
+            session = json.loads(filepath.read_text(encoding='utf-8'))
+
+        cookies = []
+        for cookie in session['cookies']:
+            # selenium names expiration "expiry", devtools names it "expires"
+            if 'expiry' in cookie:
+                cookie['expires'] = cookie.pop('expiry')
+            cookies.append(cookie)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+        if session['local_storage']:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': self.js_set_local_storage % (json.dumps(session['origin']),
+                                                       json.dumps(session['local_storage']))
+            })
+        self.count_restored += 1
+        logging.info(f'Session profile {self.profile} restored: {len(cookies)} cookies, '
+                     f'{len(session["local_storage"])} local storage items, saved {session["time"]}')
+
+    def save(self, driver) -> None:
+        """ Save session of healthy driver to its profile. Must be called on page of the site """
+
+        session = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'origin': driver.execute_script('return window.location.origin;'),
+            'cookies': driver.get_cookies(),
+            'local_storage': driver.execute_script(self.js_get_local_storage),
+        }
+        with self.lock:
+            self.dirpath.mkdir(parents=True, exist_ok=True)
+            self.filepath(self.profile).write_text(json.dumps(session), encoding='utf-8')
+
+    def resume(self) -> None:
+        """ Next driver restores profile of current driver, e.g. to continue on the same page after reboot """
+        with self.lock:
+            self.is_resume = True
+
+    def discard(self) -> None:
+        """ Forget session of current profile, e.g. after "Access Denied" """
+
+        with self.lock:
+            self.filepath(self.profile).unlink(missing_ok=True)
+            self.is_resume = False
+        logging.info(f'Session profile {self.profile} discarded')
@@ -0,0 +1,119 @@
+# logs instead of prints
+import logging
+# workers are threads, every thread has own tab
+import threading
+# to wrap driver execute
+import functools
+
+# webdriver commands names
+from selenium.webdriver.remote.command import Command
+
+# memory of chrome processes
+from processes import get_tree_memory
+
+
+class TabScheduler:
+    """ Give every worker thread own tab inside one shared browser. Every command of driver is dispatched
+    under lock, and before command driver switches to the tab of thread which sends it.
+    So all functions using one driver object may run in several threads
+    """
+
+    def __init__(self):
+        self.driver = None
+        # only one command at the moment can be sent to browser
+        self.lock = threading.RLock()
+        # idents of threads which work in own tabs
+        self.workers = set()
+        # thread ident -> window handle in current driver
+        self.handles = {}
+        # window handle which is active in driver now
+        self.current_handle = None
+        # memory of browser with one loaded tab, measured after the first page of the first worker
+        self.memory_one_tab = 0
+        # set when memory of browser with one loaded tab is measured, other workers start after it
+        self.first_page_loaded = threading.Event()
+
+    def attach(self, driver) -> None:
+        """ Wrap execute() of driver. Must be called for every new driver. Tabs of previous driver are forgotten,
+        so every worker gets new tab with the first command to new driver
+        """
+
+        with self.lock:
+            self.driver = driver
+            self.handles = {}
+            self.current_handle = driver.current_window_handle
+
+        original_execute = driver.execute
+
+        @functools.wraps(original_execute)
+        def execute(driver_command, params=None):
+            with self.lock:
+                # commands to replaced driver are not dispatched, its tabs are forgotten already
+                if self.driver is not driver:
+                    return original_execute(driver_command, params)
+
+                if driver_command == Command.SWITCH_TO_WINDOW:
+                    # remember which tab is active. Threads which are not workers (e.g. main thread) may switch
+                    response = original_execute(driver_command, params)
+                    self.current_handle = params['handle']
+                    return response
+
+                ident = threading.get_ident()
+                if ident in self.workers:
+                    if ident not in self.handles:
+                        self.open_tab(original_execute)
+                    handle = self.handles[ident]
+                    if handle != self.current_handle:
+                        original_execute(Command.SWITCH_TO_WINDOW, {'handle': handle})
+                        self.current_handle = handle
+                response = original_execute(driver_command, params)
+                # browser with one loaded tab is the cost of each additional browser
+                if driver_command == Command.GET and ident in self.workers \
+                        and not self.first_page_loaded.is_set() and len(self.handles) <= 1:
+                    self.memory_one_tab = self.get_memory()
+                    self.first_page_loaded.set()
+                return response
+
+        driver.execute = execute
+
+    def open_tab(self, original_execute) -> None:
+        """ Open own tab for current thread. The first worker gets tab which is already opened """
+
+        if not self.handles:
+            handle = self.current_handle
+        else:
+            handle = original_execute(Command.NEW_WINDOW, {'type': 'tab'})['value']['handle']
+        self.handles[threading.get_ident()] = handle
+        logging.info(f'{threading.current_thread().name} got tab {handle}. Tabs in browser: {len(self.handles)}')
+
+    def register(self) -> None:
+        """ Mark current thread as worker. Tab is opened with the first command of this thread """
+        with self.lock:
+            self.workers.add(threading.get_ident())
+
+    def unregister(self) -> None:
+        """ Current thread doesn't need own tab anymore """
+        with self.lock:
+            self.workers.discard(threading.get_ident())
+
+    def get_memory(self) -> int:
+        """ Memory of chromedriver and all chrome processes in bytes """
+        return get_tree_memory(self.driver.service.process.pid)
+
+    def report(self) -> str:
+        """ Memory per tab vs memory per browser to choose cheapest concurrency layout """
+
+        count_tabs = max(len(self.handles), 1)
+        memory = self.get_memory()
+        mb = 1024 * 1024
+        if not self.memory_one_tab:
+            return f'Browser with {count_tabs} tabs: {memory / mb:.0f} MB. Browser with 1 loaded tab was not measured'
+        lines = [f'Browser with 1 loaded tab: {self.memory_one_tab / mb:.0f} MB',
+                 f'Browser with {count_tabs} tabs: {memory / mb:.0f} MB']
+        if count_tabs > 1:
+            memory_per_tab = (memory - self.memory_one_tab) / (count_tabs - 1)
+            lines.append(f'Each additional tab: {memory_per_tab / mb:.0f} MB, '
+                         f'each additional browser: {self.memory_one_tab / mb:.0f} MB')
+            lines.append(f'{count_tabs} workers as tabs: {memory / mb:.0f} MB, '
+                         f'as browsers: {self.memory_one_tab * count_tabs / mb:.0f} MB')
+        return '\n'.join(lines)
@@ -0,0 +1,93 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from formats import (
+    restaurant_to_element,
+    element_to_restaurant,
+    restaurant_to_rows,
+    rows_to_restaurants,
+    read_restaurants,
+    RestaurantsWriter,
+)
+from convert_output import convert
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+RESTAURANT = {
+    'id': '123',
+    'name': 'Cafe',
+    'hours': {'Sat': [['10:00', '14:00'], ['16:00', '22:00']]},
+    'reviews': {
+        '1': {'username': 'user 1', 'text': 'good'},
+        '2': {},
+    },
+}
+
+
+class TestFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dirpath = Path(tempfile.mkdtemp())
+
+    def write(self, name: str, restaurants: list[dict]) -> Path:
+        filepath = self.tmp_dirpath / name
+        with RestaurantsWriter(filepath) as writer:
+            for restaurant_data in restaurants:
+                writer.write(restaurant_data)
+        return filepath
+
+    def test_element_round_trip(self):
+        restaurant_data = {**RESTAURANT, 'reviews': {'1': RESTAURANT['reviews']['1']}}
+        self.assertEqual(element_to_restaurant(restaurant_to_element(restaurant_data)), restaurant_data)
+
+    def test_rows_round_trip(self):
+        rows = [tuple(row) for row in restaurant_to_rows(RESTAURANT)]
+        self.assertEqual(list(rows_to_restaurants(rows)), [RESTAURANT])
+
+    def test_file_round_trip(self):
+        extensions = ['.jsonl', '.xml'] + (['.xlsx'] if openpyxl else [])
+        restaurant_data = {**RESTAURANT, 'reviews': {'1': RESTAURANT['reviews']['1']}}
+        for extension in extensions:
+            with self.subTest(extension=extension):
+                filepath = self.write(f'output{extension}', [restaurant_data])
+                self.assertEqual(list(read_restaurants(filepath)), [restaurant_data])
+
+    def test_convert_merges_reviews(self):
+        old = {'id': '1', 'name': 'old', 'reviews': {'a': {'text': 'old a'}, 'b': {'text': 'only old b'}}}
+        other = {'id': '2', 'name': 'other', 'reviews': {}}
+        new = {'id': '1', 'name': 'new', 'reviews': {'a': {'text': 'new a'}, 'c': {'text': 'only new c'}}}
+        first = self.write('first.jsonl', [old, other])
+        second = self.write('second.jsonl', [new])
+        output = self.tmp_dirpath / 'output.jsonl'
+
+        convert([first, second], output)
+
+        restaurants = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+        self.assertEqual([restaurant_data['id'] for restaurant_data in restaurants], ['2', '1'])
+        self.assertEqual(restaurants[1]['name'], 'new')
+        self.assertEqual(restaurants[1]['reviews'], {
+            'a': {'text': 'new a'},
+            'c': {'text': 'only new c'},
+            'b': {'text': 'only old b'},
+        })
+
+    def test_convert_without_dedupe(self):
+        first = self.write('first.jsonl', [RESTAURANT, RESTAURANT])
+        output = self.tmp_dirpath / 'output.jsonl'
+
+        convert([first], output, is_dedupe=False)
+
+        self.assertEqual(list(read_restaurants(output)), [RESTAURANT, RESTAURANT])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import main
+except ImportError:
+    main = None
+
+from exceptions import HangError
+from watchdog import Watchdog
+
+
+class FakeProcess:
+
+    def __init__(self, is_alive: bool):
+        self.pid = 0
+        self.is_alive = is_alive
+
+    def poll(self):
+        return None if self.is_alive else -9
+
+
+class FakeDriver:
+
+    def __init__(self, is_alive: bool):
+        self.service = mock.Mock(process=FakeProcess(is_alive))
+        self.is_alive = is_alive
+
+    @property
+    def current_window_handle(self):
+        if not self.is_alive:
+            raise main.WebDriverException('chrome not reachable')
+        return 'handle'
+
+
+class FakeWatchdog:
+
+    def __init__(self, event: dict | None):
+        self.event = event
+
+    def pop_fired(self):
+        event, self.event = self.event, None
+        return event
+
+
+@unittest.skipIf(main is None, 'selenium is not installed')
+class TestCollectRestaurantData(unittest.TestCase):
+
+    def setUp(self):
+        self.reboots = []
+        patches = [
+            mock.patch.object(main, 'RETRIES_LOAD_PAGE', 2),
+            mock.patch.object(main, 'sleep', lambda seconds: None),
+            mock.patch.object(main, 'get_page', side_effect=main.WebDriverException('chrome not reachable')),
+            mock.patch.object(main, 'reboot_driver', self.reboot_driver),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def reboot_driver(self, failed_driver=None, seconds=None):
+        if seconds is None:
+            seconds = main.SLEEP_DRIVER_REFRESH
+        self.reboots.append((failed_driver, seconds))
+
+    def collect(self, driver: FakeDriver, watchdog: FakeWatchdog | None):
+        url = 'https://www.tripadvisor.ru/Restaurant_Review-g298484-d1-Reviews-Cafe-Moscow.html'
+        with mock.patch.object(main, 'driver', driver, create=True), mock.patch.object(main, 'watchdog', watchdog):
+            main.collect_restaurant_data(url)
+
+    def test_dead_driver_without_event_is_rebooted_and_retried(self):
+        driver = FakeDriver(is_alive=False)
+
+        with self.assertRaises(main.WebDriverException):
+            self.collect(driver, FakeWatchdog(None))
+
+        self.assertEqual(self.reboots, [(driver, 0), (driver, 0)])
+        self.assertEqual(main.get_page.call_count, 2)
+
+    def test_alive_driver_is_not_rebooted(self):
+        driver = FakeDriver(is_alive=True)
+
+        with self.assertRaises(main.WebDriverException):
+            self.collect(driver, None)
+
+        self.assertEqual(self.reboots, [])
+
+    def test_fired_restaurant_event_raises_hang_error(self):
+        driver = FakeDriver(is_alive=False)
+        event = {'name': 'restaurant', 'thread': 'MainThread', 'timeout': 1800, 'time': ''}
+
+        with self.assertRaises(HangError):
+            self.collect(driver, FakeWatchdog(event))
+
+        # restaurant is not retried after its budget is over
+        self.assertEqual(self.reboots, [(driver, main.SLEEP_DRIVER_REFRESH)])
+        self.assertEqual(main.get_page.call_count, 1)
+
+    def test_fired_reviews_page_event_is_retried(self):
+        driver = FakeDriver(is_alive=False)
+        event = {'name': 'reviews page', 'thread': 'MainThread', 'timeout': 300, 'time': ''}
+
+        with self.assertRaises(main.WebDriverException):
+            self.collect(driver, FakeWatchdog(event))
+
+        self.assertEqual(main.get_page.call_count, 2)
+
+
+    def test_expired_restaurant_deadline_raises_hang_error(self):
+        driver = FakeDriver(is_alive=True)
+        killed = []
+
+        def kill_driver(name: str) -> bool:
+            killed.append(name)
+            driver.is_alive = False
+            return True
+
+        def get_page(url: str, page_type: str) -> bool:
+            # blocked command raises after driver is killed
+            while driver.is_alive:
+                time.sleep(0.01)
+            raise main.WebDriverException('chrome not reachable')
+
+        watchdog = Watchdog(kill_driver, check_interval=0.01)
+        watchdog.start()
+        self.addCleanup(watchdog.stop)
+        watchdog.arm('restaurant', 0.05)
+
+        with mock.patch.object(main, 'get_page', get_page), self.assertRaises(HangError):
+            self.collect(driver, watchdog)
+
+        self.assertEqual(killed, ['restaurant'])
+        self.assertEqual(self.reboots, [(driver, main.SLEEP_DRIVER_REFRESH)])
+
+
+if __name__ == '__main__':
+    unittest.main()
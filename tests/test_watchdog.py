@@ -0,0 +1,69 @@
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from watchdog import Watchdog
+
+
+class TestWatchdog(unittest.TestCase):
+
+    def start(self, on_expire) -> Watchdog:
+        watchdog = Watchdog(on_expire, check_interval=0.01)
+        watchdog.start()
+        self.addCleanup(watchdog.stop)
+        return watchdog
+
+    def wait_events(self, watchdog: Watchdog, count: int) -> None:
+        deadline = time.monotonic() + 2
+        while len(watchdog.events) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_fired_event_is_popped_only_by_its_thread(self):
+        watchdog = self.start(lambda name: True)
+        watchdog.arm('restaurant', 0.02)
+        self.wait_events(watchdog, 1)
+
+        events = []
+        other = threading.Thread(target=lambda: events.append(watchdog.pop_fired()))
+        other.start()
+        other.join()
+
+        self.assertEqual(events, [None])
+        event = watchdog.pop_fired()
+        self.assertEqual((event['name'], event['thread']), ('restaurant', threading.current_thread().name))
+        self.assertIsNone(watchdog.pop_fired())
+
+    def test_disarmed_deadline_does_not_fire(self):
+        watchdog = self.start(lambda name: True)
+        watchdog.arm('restaurant', 0.05)
+        watchdog.disarm('restaurant')
+        time.sleep(0.1)
+
+        self.assertEqual(watchdog.events, [])
+        self.assertIsNone(watchdog.pop_fired())
+
+    def test_clear_fired(self):
+        watchdog = self.start(lambda name: True)
+        watchdog.arm('reviews page', 0.02)
+        self.wait_events(watchdog, 1)
+
+        watchdog.clear_fired()
+
+        self.assertIsNone(watchdog.pop_fired())
+
+    def test_unhandled_event_is_recorded_but_not_fired(self):
+        # e.g. driver was not alive, there was nothing to kill
+        watchdog = self.start(lambda name: False)
+        watchdog.arm('restaurant', 0.02)
+        self.wait_events(watchdog, 1)
+
+        self.assertEqual(len(watchdog.events), 1)
+        self.assertIsNone(watchdog.pop_fired())
+
+
+if __name__ == '__main__':
+    unittest.main()
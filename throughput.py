@@ -0,0 +1,194 @@
+# logs instead of prints
+import logging
+# durations of steps and run time
+import time
+# status file and history of runs
+import json
+# status is written in background thread
+import threading
+# rolling window of step durations
+from collections import deque
+# median of previous runs
+import statistics
+# atomic rewrite of status file
+import os
+# to create filepath which not OS dependency
+from pathlib import Path
+
+# count of last durations per step, which are used for percentiles
+WINDOW = 10_000
+
+
+def percentile(values: list[float], q: float) -> float:
+    """ Nearest-rank percentile of sorted values, 0 for empty values """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class ThroughputMonitor(threading.Thread):
+    """ Background thread which rewrites status json file and logs compact progress line every interval.
+    Workers account restaurants, reviews, durations of steps and sleeps. Run summary is appended
+    to history file and compared with previous runs
+    """
+
+    def __init__(self, status_filepath: Path, history_filepath: Path, interval: float, settings: dict):
+        super().__init__(name='throughput', daemon=True)
+        self.status_filepath = status_filepath
+        self.history_filepath = history_filepath
+        self.interval = interval
+        # settings of this run, they are saved in history to explain changes of throughput.
+        # Round-trip through json, so they are compared with settings of previous runs as equal types
+        self.settings = json.loads(json.dumps(settings, default=str))
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.start_time = time.time()
+        self.start_monotonic = time.monotonic()
+        self.total = 0
+        self.done = 0
+        self.failed = 0
+        self.reviews = 0
+        # step name -> last durations, seconds
+        self.steps = {}
+        # total seconds of time.sleep() in all workers
+        self.sleeps = 0.0
+        # total seconds of restaurants in all workers
+        self.busy = 0.0
+
+    def add_total(self, count: int) -> None:
+        """ Count restaurants which are planned to scrap """
+        with self.lock:
+            self.total += count
+
+    def add_step(self, name: str, duration: float) -> None:
+        with self.lock:
+            self.steps.setdefault(name, deque(maxlen=WINDOW)).append(duration)
+
+    def add_sleep(self, seconds: float) -> None:
+        with self.lock:
+            self.sleeps += seconds
+
+    def add_restaurant(self, duration: float, count_reviews: int, is_failed: bool) -> None:
+        """ Account finished restaurant. Failed restaurant is done too, it's moved to dead-letter queue """
+        with self.lock:
+            self.done += 1
+            self.failed += is_failed
+            self.reviews += count_reviews
+            self.busy += duration
+            self.steps.setdefault('restaurant', deque(maxlen=WINDOW)).append(duration)
+
+    def status(self) -> dict:
+        """ Current throughput, latency of steps, share of sleeps and ETA """
+
+        with self.lock:
+            elapsed = time.monotonic() - self.start_monotonic
+            minutes = elapsed / 60 or 1
+            restaurants_per_min = self.done / minutes
+            eta = (self.total - self.done) / restaurants_per_min * 60 if self.done else None
+            steps = {}
+            for name, durations in self.steps.items():
+                durations = sorted(durations)
+                steps[name] = {
+                    'count': len(durations),
+                    'p50': round(percentile(durations, 0.5), 3),
+                    'p95': round(percentile(durations, 0.95), 3),
+                    'max': round(durations[-1], 3),
+                }
+            return {
+                'start': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.start_time)),
+                'elapsed': round(elapsed),
+                'total': self.total,
+                'done': self.done,
+                'failed': self.failed,
+                'reviews': self.reviews,
+                'restaurants_per_min': round(restaurants_per_min, 2),
+                'reviews_per_min': round(self.reviews / minutes, 2),
+                'sleep_share': round(self.sleeps / self.busy, 3) if self.busy else 0.0,
+                'eta': round(eta) if eta is not None else None,
+                'steps': steps,
+            }
+
+    def write_status(self) -> dict:
+        """ Rewrite status file atomically, so reader never sees half-written file """
+
+        status = self.status()
+        tmp_filepath = self.status_filepath.with_suffix('.tmp')
+        tmp_filepath.write_text(json.dumps(status, indent=2), encoding='utf-8')
+        os.replace(tmp_filepath, self.status_filepath)
+        return status
+
+    @staticmethod
+    def line(status: dict) -> str:
+        """ Compact progress line """
+
+        eta = '?'
+        if status['eta'] is not None:
+            # hours are not limited by 24
+            eta = f'{status["eta"] // 3600}:{status["eta"] % 3600 // 60:02}:{status["eta"] % 60:02}'
+        restaurant = status['steps'].get('restaurant', {})
+        return (f'Progress {status["done"]}/{status["total"]} ({status["failed"]} failed), '
+                f'{status["restaurants_per_min"]} restaurants/min, {status["reviews_per_min"]} reviews/min, '
+                f'restaurant p50 {restaurant.get("p50", 0)}s p95 {restaurant.get("p95", 0)}s, '
+                f'sleeps {status["sleep_share"]:.0%} of work, ETA {eta}')
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                logging.info(self.line(self.write_status()), extra={'count': self.done})
+            except OSError:
+                logging.warning(f'Unable to write status to "{self.status_filepath}"', exc_info=True)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def report(self, compare_runs: int, drop_ratio: float) -> str:
+        """ Append this run to history and compare it with median of previous runs """
+
+        status = self.write_status()
+        run = {
+            'start': status['start'],
+            'elapsed': status['elapsed'],
+            'done': status['done'],
+            'failed': status['failed'],
+            'restaurants_per_min': status['restaurants_per_min'],
+            'reviews_per_min': status['reviews_per_min'],
+            'sleep_share': status['sleep_share'],
+            'restaurant_p50': status['steps'].get('restaurant', {}).get('p50', 0),
+            'restaurant_p95': status['steps'].get('restaurant', {}).get('p95', 0),
+            'settings': self.settings,
+        }
+
+        previous = []
+        if self.history_filepath.exists():
+            with open(self.history_filepath, encoding='utf-8') as f:
+                previous = [json.loads(line) for line in f if line.strip()]
+        # runs without restaurants say nothing about throughput
+        previous = [previous_run for previous_run in previous if previous_run['done']][-compare_runs:]
+        with open(self.history_filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, default=str) + '\n')
+
+        lines = ['Throughput report:', self.line(status)]
+        for name, stats in status['steps'].items():
+            lines.append(f'  {name}: count {stats["count"]}, p50 {stats["p50"]}s, p95 {stats["p95"]}s, '
+                         f'max {stats["max"]}s')
+        if not previous or not run['done']:
+            lines.append('No previous runs to compare')
+            return '\n'.join(lines)
+
+        lines.append(f'Compared with median of {len(previous)} previous runs:')
+        for key in ('restaurants_per_min', 'reviews_per_min', 'restaurant_p50', 'restaurant_p95', 'sleep_share'):
+            median = round(statistics.median(previous_run[key] for previous_run in previous), 3)
+            change = f'{(run[key] / median - 1):+.0%}' if median else 'n/a'
+            lines.append(f'  {key}: {run[key]} vs {median} ({change})')
+
+        median = statistics.median(previous_run['restaurants_per_min'] for previous_run in previous)
+        if run['restaurants_per_min'] < median * drop_ratio:
+            lines.append(f'WARNING: throughput dropped below {drop_ratio:.0%} of previous runs. '
+                         f'Check site changes or settings')
+            changed = {key: (previous[-1]['settings'].get(key), value) for key, value in self.settings.items()
+                       if previous[-1]['settings'].get(key) != value}
+            if changed:
+                lines.append(f'Settings changed since last run (was, now): {changed}')
+        return '\n'.join(lines)
@@ -0,0 +1,85 @@
+# logs instead of prints
+import logging
+# time of deadlines
+import time
+# watchdog runs in background thread
+import threading
+# callback type hint
+from typing import Callable
+
+
+class Watchdog(threading.Thread):
+    """ Background thread which enforces wall-clock deadlines. Deadline is armed before some blocking
+    work and disarmed after it. If deadline expired, on_expire callback is called (e.g. kill stuck driver,
+    so blocked webdriver command raises in main thread) and event is recorded. Callback returns False
+    if there was nothing to handle, then event is not fired to thread
+    """
+
+    def __init__(self, on_expire: Callable[[str], bool], check_interval: float = 1):
+        super().__init__(name='watchdog', daemon=True)
+        self.on_expire = on_expire
+        self.check_interval = check_interval
+        # (thread name, deadline name) -> (timeout, expire time)
+        self.deadlines = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        # all expired deadlines for this run
+        self.events = []
+        # thread name -> last expired deadline of this thread which was not handled yet
+        self.fired_events = {}
+
+    def arm(self, name: str, timeout: float) -> None:
+        """ Set (or reset) deadline with name for current thread """
+        with self.lock:
+            self.deadlines[(threading.current_thread().name, name)] = (timeout, time.monotonic() + timeout)
+
+    def disarm(self, name: str) -> None:
+        """ Remove deadline with name for current thread """
+        with self.lock:
+            self.deadlines.pop((threading.current_thread().name, name), None)
+
+    def pop_fired(self) -> dict | None:
+        """ Get expired deadline event of current thread if it was, and mark it as handled """
+        with self.lock:
+            return self.fired_events.pop(threading.current_thread().name, None)
+
+    def clear_fired(self) -> None:
+        """ Forget expired deadline event of current thread, e.g. when work under deadline is finished """
+        with self.lock:
+            self.fired_events.pop(threading.current_thread().name, None)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.check_interval):
+            now = time.monotonic()
+            with self.lock:
+                expired = [(key, timeout) for key, (timeout, expire_time) in self.deadlines.items()
+                           if now > expire_time]
+                for key, _ in expired:
+                    del self.deadlines[key]
+            if not expired:
+                continue
+
+            (thread_name, name), timeout = expired[0]
+            event = {'name': name, 'thread': thread_name, 'timeout': timeout,
+                     'time': time.strftime('%Y-%m-%d %H:%M:%S')}
+            logging.warning(f'Watchdog: deadline "{name}" of {thread_name} expired after {timeout} seconds. '
+                            f'Killing driver')
+            try:
+                is_handled = self.on_expire(name)
+            except Exception as ex:
+                is_handled = False
+                logging.error(f'Watchdog: unable to handle expired deadline "{name}"\n{ex}', exc_info=True)
+            with self.lock:
+                self.events.append(event)
+                if is_handled:
+                    self.fired_events[thread_name] = event
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def report(self) -> str:
+        """ Expired deadlines for this run """
+        lines = [f'Watchdog: {len(self.events)} expired deadlines']
+        for event in self.events:
+            lines.append(f'{event["time"]} "{event["name"]}" of {event["thread"]} after {event["timeout"]} seconds')
+        return '\n'.join(lines)